@@ -0,0 +1,45 @@
+import argparse
+import random
+import time
+
+import compartidos  # añade la raíz del repositorio (corpus) a sys.path
+import vigenere
+from corpus import cifrar_vigenere, generar_texto_normalizado
+
+def claves_diagonal(posible_clave):
+    # Método anterior: la clave i toma el i-ésimo mejor desplazamiento de cada columna
+    for i in range(vigenere.N_TRIES):
+        yield "".join(vigenere.index_to_char(col["mejores_desplazamientos"][i][0]) for col in posible_clave)
+
+def medir(longitud, pruebas, max_claves, ancho_haz, semilla):
+    rng = random.Random(semilla)
+    encontradas_diagonal = encontradas_haz = generadas = 0
+    tiempo = 0.0
+    for _ in range(pruebas):
+        clave = "".join(rng.choice(vigenere.ALPHABET) for _ in range(rng.randint(4, 12)))
+        cifrado = cifrar_vigenere(generar_texto_normalizado(longitud, rng), clave)
+        columnas = vigenere.analisis_columnas(vigenere.histogramas_columnas(cifrado, len(clave)))
+
+        encontradas_diagonal += clave in set(claves_diagonal(columnas))
+
+        inicio = time.perf_counter()
+        claves = [c for c, _ in vigenere.enumerar_claves(columnas, max_claves, ancho_haz)]
+        tiempo += time.perf_counter() - inicio
+        generadas += len(claves)
+        encontradas_haz += clave in claves
+
+    print(f"longitud {longitud}: diagonal {encontradas_diagonal / pruebas:.0%}, "
+          f"mejor primero {encontradas_haz / pruebas:.0%} "
+          f"({max_claves} claves, haz {ancho_haz}), {generadas / tiempo:,.0f} claves/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recuperación de la clave (longitud conocida) y claves candidatas por segundo.")
+    parser.add_argument("-l", "--longitudes", type=int, nargs="+", default=[150, 300, 1000])
+    parser.add_argument("-n", "--pruebas", type=int, default=50)
+    parser.add_argument("-k", "--claves", type=int, default=1000)
+    parser.add_argument("-a", "--ancho-haz", type=int, default=vigenere.ANCHO_HAZ)
+    parser.add_argument("-s", "--semilla", type=int, default=0)
+    args = parser.parse_args()
+    for longitud in args.longitudes:
+        medir(longitud, args.pruebas, args.claves, args.ancho_haz, args.semilla)
@@ -0,0 +1,39 @@
+import argparse
+import random
+import time
+
+import compartidos  # añade la raíz del repositorio (corpus) a sys.path
+import vigenere
+from corpus import cifrar_vigenere, generar_texto_normalizado
+
+ESTIMADORES = {
+    "trigramas": lambda texto: vigenere.mcd_max_subconjunto(list(vigenere.distancias_ngramas(texto, 3))),
+    "autocorrelacion": vigenere.longitudes_autocorrelacion,
+    "coincidencia": vigenere.longitudes_indice_coincidencia,
+}
+
+def medir(longitudes, pruebas, semilla):
+    rng = random.Random(semilla)
+    print(f"{'estimador':<16}{'longitud':>10}{'ms/texto':>12}{'acierto':>10}")
+    for longitud in longitudes:
+        casos = []
+        for _ in range(pruebas):
+            clave = "".join(rng.choice(vigenere.ALPHABET) for _ in range(rng.randint(3, 15)))
+            casos.append((cifrar_vigenere(generar_texto_normalizado(longitud, rng), clave), len(clave)))
+
+        for nombre, estimador in ESTIMADORES.items():
+            aciertos = 0
+            inicio = time.perf_counter()
+            for cifrado, real in casos:
+                candidatos = estimador(cifrado)
+                aciertos += bool(candidatos) and candidatos[0][0] == real
+            ms = (time.perf_counter() - inicio) * 1000 / pruebas
+            print(f"{nombre:<16}{longitud:>10}{ms:>12.2f}{aciertos / pruebas:>10.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara estimadores de longitud de clave (latencia y acierto).")
+    parser.add_argument("-l", "--longitudes", type=int, nargs="+", default=[150, 500, 2000, 20000, 200000])
+    parser.add_argument("-n", "--pruebas", type=int, default=20)
+    parser.add_argument("-s", "--semilla", type=int, default=0)
+    args = parser.parse_args()
+    medir(args.longitudes, args.pruebas, args.semilla)
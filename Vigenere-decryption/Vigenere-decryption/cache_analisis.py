@@ -0,0 +1,95 @@
+import hashlib
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+
+MAX_MEMORIA = 64 << 20
+
+# Cada entrada se guarda serializada con pickle: su tamaño es exacto y quien la lee
+# recibe una copia que puede modificar sin tocar la caché.
+class CacheAnalisis:
+    def __init__(self, ruta: str | None = None, max_memoria: int = MAX_MEMORIA, max_disco: int | None = None):
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self.memoria = OrderedDict()
+        self.ocupado = 0
+        self.aciertos = self.fallos = 0
+
+        self.conexion = None
+        if ruta is not None:
+            self.conexion = sqlite3.connect(ruta, timeout=30)
+            self.conexion.execute(
+                "CREATE TABLE IF NOT EXISTS analisis (clave TEXT PRIMARY KEY, valor BLOB, tam INTEGER, usado REAL)")
+            self.conexion.commit()
+
+    @staticmethod
+    def huella(texto_normalizado: str, alfabeto: str) -> str:
+        return hashlib.sha256(f"{alfabeto}\0{texto_normalizado}".encode("utf-8")).hexdigest()
+
+    def buscar(self, huella: str, etapa: tuple):
+        clave = f"{huella}:{etapa!r}"
+        datos = self.memoria.get(clave)
+        if datos is not None:
+            self.memoria.move_to_end(clave)
+        elif self.conexion is not None:
+            fila = self.conexion.execute("SELECT valor FROM analisis WHERE clave = ?", (clave,)).fetchone()
+            if fila is not None:
+                datos = fila[0]
+                self.conexion.execute("UPDATE analisis SET usado = ? WHERE clave = ?", (time.time(), clave))
+                self.conexion.commit()
+                self._en_memoria(clave, datos)
+
+        if datos is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return pickle.loads(datos)
+
+    def guardar(self, huella: str, etapa: tuple, valor):
+        clave = f"{huella}:{etapa!r}"
+        datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        self._en_memoria(clave, datos)
+        if self.conexion is not None:
+            self.conexion.execute("INSERT OR REPLACE INTO analisis VALUES (?, ?, ?, ?)",
+                                  (clave, datos, len(datos), time.time()))
+            if self.max_disco is not None:
+                self._recortar_disco()
+            self.conexion.commit()
+
+    def obtener(self, huella: str, etapa: tuple, calcular):
+        valor = self.buscar(huella, etapa)
+        if valor is None:
+            valor = calcular()
+            self.guardar(huella, etapa, valor)
+        return valor
+
+    def _en_memoria(self, clave: str, datos: bytes):
+        if clave in self.memoria:
+            self.ocupado -= len(self.memoria.pop(clave))
+        if len(datos) > self.max_memoria:
+            return
+        self.memoria[clave] = datos
+        self.ocupado += len(datos)
+        # Se expulsan las entradas usadas hace más tiempo hasta caber en max_memoria
+        while self.ocupado > self.max_memoria:
+            _, expulsado = self.memoria.popitem(last=False)
+            self.ocupado -= len(expulsado)
+
+    def _recortar_disco(self):
+        total = self.conexion.execute("SELECT COALESCE(SUM(tam), 0) FROM analisis").fetchone()[0]
+        if total <= self.max_disco:
+            return
+        liberado = 0
+        expulsar = []
+        for clave, tam in self.conexion.execute("SELECT clave, tam FROM analisis ORDER BY usado"):
+            if total - liberado <= self.max_disco:
+                break
+            expulsar.append((clave,))
+            liberado += tam
+        self.conexion.executemany("DELETE FROM analisis WHERE clave = ?", expulsar)
+
+    def cerrar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# normalizacion.py y corpus.py están una sola vez, en la raíz del repositorio, y los comparten
+# las herramientas de las dos carpetas. Importar este módulo añade la raíz al final de sys.path.
+RAIZ = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
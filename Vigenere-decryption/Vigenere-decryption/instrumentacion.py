@@ -0,0 +1,100 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Contexto vacío que se devuelve cuando no hay medidor: no mide ni reserva nada
+NULO = nullcontext()
+
+def etapa(medidor, nombre: str, elementos: int | None = None):
+    return NULO if medidor is None else medidor.etapa(nombre, elementos)
+
+def contar(medidor, nombre: str, cantidad: int = 1):
+    if medidor is not None:
+        medidor.contar(nombre, cantidad)
+
+# Las etapas se anidan: el nombre de cada una lleva delante el de sus etapas exteriores
+# ("descifrar/longitudes/distancias"). Por nombre se acumulan llamadas, segundos,
+# elementos procesados y, con memoria=True, el pico de memoria reservada (tracemalloc).
+class Medidor:
+    def __init__(self, memoria: bool = False, callback=None):
+        self.memoria = memoria
+        self.callback = callback
+        self.etapas = {}
+        self.contadores = {}
+        self.pila = []
+        self._iniciado_tracemalloc = False
+
+    @contextmanager
+    def etapa(self, nombre: str, elementos: int | None = None):
+        ruta = "/".join([*(e["nombre"] for e in self.pila), nombre])
+        # Se registra al entrar para que el informe siga el orden de ejecución
+        self.etapas.setdefault(ruta, {"llamadas": 0, "segundos": 0.0, "elementos": 0})
+        actual = {"nombre": nombre, "pico": 0, "memoria_inicial": 0}
+        if self.memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciado_tracemalloc = True
+            memoria, pico = tracemalloc.get_traced_memory()
+            if self.pila:
+                # reset_peak borra el pico que llevaba la etapa exterior: se le guarda antes
+                self.pila[-1]["pico"] = max(self.pila[-1]["pico"], pico)
+            tracemalloc.reset_peak()
+            actual["memoria_inicial"] = memoria
+        self.pila.append(actual)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self.pila.pop()
+            registro = {"etapa": ruta, "segundos": segundos, "elementos": elementos}
+            if self.memoria:
+                pico = max(actual["pico"], tracemalloc.get_traced_memory()[1])
+                registro["memoria_pico"] = pico - actual["memoria_inicial"]
+                if self.pila:
+                    self.pila[-1]["pico"] = max(self.pila[-1]["pico"], pico)
+                elif self._iniciado_tracemalloc:
+                    tracemalloc.stop()
+                    self._iniciado_tracemalloc = False
+            self._acumular(registro)
+
+    def _acumular(self, registro: dict):
+        total = self.etapas[registro["etapa"]]
+        total["llamadas"] += 1
+        total["segundos"] += registro["segundos"]
+        if registro["elementos"] is not None:
+            total["elementos"] += registro["elementos"]
+        if "memoria_pico" in registro:
+            total["memoria_pico"] = max(total.get("memoria_pico", 0), registro["memoria_pico"])
+        if self.callback is not None:
+            self.callback(registro)
+
+    def contar(self, nombre: str, cantidad: int = 1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def informe(self) -> dict:
+        etapas = {}
+        for ruta, total in self.etapas.items():
+            etapas[ruta] = dict(total)
+            if total["elementos"] and total["segundos"]:
+                etapas[ruta]["elementos_por_s"] = total["elementos"] / total["segundos"]
+        return {"etapas": etapas, "contadores": dict(self.contadores)}
+
+    def json(self, **opciones) -> str:
+        return json.dumps(self.informe(), ensure_ascii=False, **opciones)
+
+    def resumen(self) -> str:
+        lineas = []
+        for ruta, total in self.etapas.items():
+            sangria = "  " * ruta.count("/")
+            linea = f"{sangria}{ruta.rsplit('/', 1)[-1]:<{32 - len(sangria)}}{total['segundos'] * 1000:>10.2f} ms"
+            if total["llamadas"] > 1:
+                linea += f"  x{total['llamadas']}"
+            if total["elementos"]:
+                linea += f"  {total['elementos']:,} elementos"
+            if "memoria_pico" in total:
+                linea += f"  {total['memoria_pico'] / (1 << 20):.2f} MB"
+            lineas.append(linea)
+        lineas.extend(f"{nombre}: {valor:,}" for nombre, valor in self.contadores.items())
+        return "\n".join(lineas)
@@ -0,0 +1,120 @@
+import argparse
+import mmap
+import os
+from array import array
+from functools import lru_cache
+from math import log10
+
+import compartidos  # añade la raíz del repositorio (normalizacion) a sys.path
+from normalizacion import ALFABETO_27, Alfabeto, normalizar_flujo, obtener_alfabeto
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+NOMBRES = {2: "bigramas", 3: "trigramas", 4: "cuadrigramas"}
+CARPETA_TABLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablas_ngramas")
+TAM_TROZO = 1 << 20
+ALFABETO = obtener_alfabeto(ALFABETO_27)
+
+# --------------------------------------------
+# CONSTRUCCIÓN DE TABLAS
+# --------------------------------------------
+# La tabla de n-gramas es un arreglo float32 de N^n casillas: el n-grama c0 c1 ... se guarda
+# en la casilla c0*N^(n-1) + c1*N^(n-2) + ..., con su log10 de probabilidad.
+def ruta_tabla(n: int, alfabeto: Alfabeto = ALFABETO, carpeta: str = CARPETA_TABLAS) -> str:
+    return os.path.join(carpeta, f"{NOMBRES[n]}_{alfabeto.n}.f32")
+
+def contar_ngramas(trozos, n: int, alfabeto: Alfabeto = ALFABETO) -> array:
+    # Los trozos normalizados se recorren con un código rodante que no se reinicia entre trozos
+    base = alfabeto.n
+    modulo = base ** n
+    conteos = array("q", [0]) * modulo
+    codigo, vistos = 0, 0
+    for trozo in normalizar_flujo(trozos, alfabeto.letras):
+        for c in alfabeto.codificar(trozo):
+            codigo = (codigo * base + c) % modulo
+            vistos += 1
+            if vistos >= n:
+                conteos[codigo] += 1
+    return conteos
+
+def construir_tabla(trozos, n: int, alfabeto: Alfabeto = ALFABETO) -> array:
+    conteos = contar_ngramas(trozos, n, alfabeto)
+    total = sum(conteos)
+    if total == 0:
+        raise ValueError("El corpus no tiene n-gramas del alfabeto")
+    # Los n-gramas que no aparecen cuentan como 0.01 apariciones
+    return array("f", (log10((c or 0.01) / total) for c in conteos))
+
+def guardar_tabla(tabla: array, ruta: str):
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta, "wb") as f:
+        tabla.tofile(f)
+
+def leer_trozos(ruta, tam_trozo=TAM_TROZO):
+    with open(ruta, "r", encoding="utf-8") as f:
+        while trozo := f.read(tam_trozo):
+            yield trozo
+
+# --------------------------------------------
+# PUNTUACIÓN
+# --------------------------------------------
+@lru_cache(maxsize=None)
+def cargar_tabla(ruta: str):
+    # Una vez por proceso; el archivo se mapea en memoria y sus páginas se comparten entre procesos
+    if np is not None:
+        return np.memmap(ruta, dtype=np.float32, mode="r")
+    with open(ruta, "rb") as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapa).cast("f")
+
+class PuntuadorNgramas:
+    # Log-verosimilitud media por n-grama. Solo guarda la ruta: al enviarlo a otro
+    # proceso no viaja la tabla, que se carga allí la primera vez que se usa.
+    def __init__(self, n: int, alfabeto: Alfabeto = ALFABETO, ruta: str | None = None):
+        if n not in NOMBRES:
+            raise ValueError(f"n debe ser uno de {sorted(NOMBRES)}")
+        self.n = n
+        self.alfabeto = alfabeto
+        self.ruta = ruta or ruta_tabla(n, alfabeto)
+
+    def __repr__(self):
+        return f"PuntuadorNgramas({self.n}, ruta={self.ruta!r})"
+
+    def puntuar_codigos(self, codigos: bytes) -> float:
+        n, base = self.n, self.alfabeto.n
+        if len(codigos) < n:
+            return float("-inf")
+        tabla = cargar_tabla(self.ruta)
+
+        if np is not None:
+            c = np.frombuffer(codigos, dtype=np.uint8).astype(np.int64)
+            indices = np.zeros(len(c) - n + 1, dtype=np.int64)
+            for k in range(n):
+                indices = indices * base + c[k:len(c) - n + 1 + k]
+            return float(np.take(tabla, indices).mean(dtype=np.float64))
+
+        modulo = base ** n
+        codigo, suma = 0, 0.0
+        for i, c in enumerate(codigos):
+            codigo = (codigo * base + c) % modulo
+            if i >= n - 1:
+                suma += tabla[codigo]
+        return suma / (len(codigos) - n + 1)
+
+    def __call__(self, texto: str) -> float:
+        return self.puntuar_codigos(self.alfabeto.codificar(texto))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye tablas de n-gramas a partir de un corpus de texto.")
+    parser.add_argument("corpus", nargs="+", help="archivos de texto en español (UTF-8)")
+    parser.add_argument("-n", type=int, nargs="+", default=[2, 3, 4], choices=sorted(NOMBRES))
+    parser.add_argument("-o", "--carpeta", default=CARPETA_TABLAS)
+    args = parser.parse_args()
+    for n in args.n:
+        trozos = (t for ruta in args.corpus for t in leer_trozos(ruta))
+        ruta = ruta_tabla(n, carpeta=args.carpeta)
+        guardar_tabla(construir_tabla(trozos, n), ruta)
+        print(f"{NOMBRES[n]}: {ruta}")
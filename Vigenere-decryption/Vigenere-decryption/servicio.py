@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import compartidos  # añade la raíz del repositorio (normalizacion) a sys.path
+import vigenere
+from cache_analisis import CacheAnalisis
+from ngramas import PuntuadorNgramas
+from normalizacion import ALFABETO_27, ALFABETO_191, obtener_alfabeto
+
+# Protocolo: una línea JSON por mensaje. Petición {"id": ..., "texto": "...", "alfabeto": 27 | 191};
+# respuesta {"id": ..., "origen": "nuevo" | "cache" | "duplicado", "resultados": [...]}
+# o {"id": ..., "error": "..."}. Las respuestas salen según terminan, no en orden.
+SOCKET = os.path.join(tempfile.gettempdir(), "vigenere.sock")
+MAX_CACHE = 10000
+LIMITE_LINEA = 1 << 26
+CAMPOS = ("clave", "tipo", "score", "preview")
+ALFABETOS = {27: ALFABETO_27, 191: ALFABETO_191}
+
+def clave_cache(texto_normalizado: str, alfabeto: str) -> str:
+    return hashlib.sha256(f"{alfabeto}\0{texto_normalizado}".encode("utf-8")).hexdigest()
+
+# Caché de análisis de cada proceso trabajador, abierta en su primer trabajo
+_cache_trabajador = None
+
+def _trabajo(texto_normalizado, alfabeto, opciones, ruta_cache=None):
+    # En el proceso trabajador: cada texto usa un solo núcleo, el paralelismo es entre textos
+    global _cache_trabajador
+    if ruta_cache is not None and _cache_trabajador is None:
+        _cache_trabajador = CacheAnalisis(ruta_cache)
+    opciones = dict(opciones)
+    puntuador = opciones.get("puntuador")
+    if puntuador is not None and puntuador.alfabeto != alfabeto:
+        # La tabla de n-gramas es de otro alfabeto
+        opciones["puntuador"] = None
+    return vigenere.descifrar_resultados(texto_normalizado, procesos=1, cache=_cache_trabajador,
+                                         alfabeto=alfabeto, **opciones)
+
+# --------------------------------------------
+# SERVIDOR
+# --------------------------------------------
+class Servicio:
+    def __init__(self, procesos=None, max_cache=MAX_CACHE, ruta_cache=None, **opciones):
+        # Los procesos se crean una vez y atienden todas las peticiones
+        self.pool = ProcessPoolExecutor(procesos)
+        self.max_cache = max_cache
+        self.ruta_cache = ruta_cache
+        self.opciones = opciones
+        self.cache = OrderedDict()
+        self.en_curso = {}
+
+    async def resolver(self, texto: str, alfabeto=vigenere.ALFABETO):
+        normalizado = alfabeto.normalizar(texto)
+        clave = clave_cache(normalizado, alfabeto.letras)
+
+        if clave in self.cache:
+            self.cache.move_to_end(clave)
+            return self.cache[clave], "cache"
+        if clave in self.en_curso:
+            # El mismo texto ya está en cola: se espera al mismo trabajo
+            return await asyncio.shield(self.en_curso[clave]), "duplicado"
+
+        bucle = asyncio.get_running_loop()
+        futuro = bucle.run_in_executor(self.pool, _trabajo, normalizado, alfabeto, self.opciones, self.ruta_cache)
+        self.en_curso[clave] = futuro
+        try:
+            resultados = await asyncio.shield(futuro)
+        finally:
+            del self.en_curso[clave]
+
+        self.cache[clave] = resultados
+        if len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+        return resultados, "nuevo"
+
+    async def responder(self, linea: bytes, escritor, bloqueo):
+        identificador = None
+        try:
+            peticion = json.loads(linea)
+            if isinstance(peticion, dict):
+                # Antes de validar el resto: el error también debe llevar el id de la petición
+                identificador = peticion.get("id")
+            if not isinstance(peticion, dict) or not isinstance(peticion.get("texto"), str):
+                raise ValueError('Se esperaba {"id": ..., "texto": "..."}')
+            letras = ALFABETOS.get(peticion.get("alfabeto", 27))
+            if letras is None:
+                raise ValueError(f"Alfabeto desconocido; opciones: {sorted(ALFABETOS)}")
+            resultados, origen = await self.resolver(peticion["texto"], obtener_alfabeto(letras))
+            respuesta = {"id": identificador, "origen": origen,
+                         "resultados": [dict(zip(CAMPOS, r)) for r in resultados]}
+        except Exception as e:
+            respuesta = {"id": identificador, "error": str(e)}
+
+        async with bloqueo:
+            escritor.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+            await escritor.drain()
+
+    async def atender(self, lector, escritor):
+        bloqueo = asyncio.Lock()
+        pendientes = set()
+        try:
+            while linea := await lector.readline():
+                if linea.strip():
+                    tarea = asyncio.create_task(self.responder(linea, escritor, bloqueo))
+                    pendientes.add(tarea)
+                    tarea.add_done_callback(pendientes.discard)
+        except (ConnectionError, ValueError):
+            # Cliente desconectado o línea más larga que LIMITE_LINEA
+            pass
+        finally:
+            await asyncio.gather(*pendientes, return_exceptions=True)
+            escritor.close()
+
+async def servir(ruta_socket=SOCKET, puerto=None, host="127.0.0.1", **opciones):
+    servicio = Servicio(**opciones)
+    if puerto is not None:
+        servidor = await asyncio.start_server(servicio.atender, host, puerto, limit=LIMITE_LINEA)
+    else:
+        if os.path.exists(ruta_socket):
+            os.remove(ruta_socket)
+        servidor = await asyncio.start_unix_server(servicio.atender, ruta_socket, limit=LIMITE_LINEA)
+    with servicio.pool:
+        async with servidor:
+            await servidor.serve_forever()
+
+# --------------------------------------------
+# CLIENTE
+# --------------------------------------------
+async def enviar(textos, ruta_socket=SOCKET, puerto=None, host="127.0.0.1", alfabeto=27):
+    # Envía todos los textos por una conexión y devuelve las respuestas según llegan
+    if puerto is not None:
+        lector, escritor = await asyncio.open_connection(host, puerto, limit=LIMITE_LINEA)
+    else:
+        lector, escritor = await asyncio.open_unix_connection(ruta_socket, limit=LIMITE_LINEA)
+
+    textos = list(textos)
+    for i, texto in enumerate(textos):
+        escritor.write(json.dumps({"id": i, "texto": texto, "alfabeto": alfabeto}, ensure_ascii=False).encode("utf-8") + b"\n")
+    await escritor.drain()
+
+    respuestas = []
+    for _ in textos:
+        respuestas.append(json.loads(await lector.readline()))
+    escritor.close()
+    await escritor.wait_closed()
+    return respuestas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de descifrado por lotes.")
+    parser.add_argument("--socket", default=SOCKET, help="socket Unix (por defecto %(default)s)")
+    parser.add_argument("--puerto", type=int, help="escuchar en TCP 127.0.0.1 en lugar del socket Unix")
+    sub = parser.add_subparsers(dest="orden", required=True)
+
+    p_servir = sub.add_parser("servir", help="arrancar el servicio")
+    p_servir.add_argument("-j", "--procesos", type=int, help="procesos trabajadores (por defecto, todos los núcleos)")
+    p_servir.add_argument("--cache", type=int, default=MAX_CACHE, help="resultados guardados en memoria")
+    p_servir.add_argument("--cache-disco", help="base sqlite con los análisis intermedios, persiste entre arranques")
+    p_servir.add_argument("-k", "--claves", type=int, default=vigenere.N_TRIES, help="claves por longitud")
+    p_servir.add_argument("--ngramas", type=int, choices=[2, 3, 4], help="puntuar con la tabla de n-gramas")
+
+    p_enviar = sub.add_parser("enviar", help="descifrar archivos (o una línea de stdin por texto)")
+    p_enviar.add_argument("archivos", nargs="*")
+    p_enviar.add_argument("--alfabeto", type=int, choices=sorted(ALFABETOS), default=27)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.orden == "servir":
+            puntuador = PuntuadorNgramas(args.ngramas) if args.ngramas else None
+            asyncio.run(servir(args.socket, args.puerto, procesos=args.procesos, max_cache=args.cache,
+                               ruta_cache=args.cache_disco,
+                               claves_por_longitud=args.claves, puntuador=puntuador))
+        else:
+            if args.archivos:
+                textos = []
+                for ruta in args.archivos:
+                    with open(ruta, "r", encoding="utf-8") as f:
+                        textos.append(f.read())
+            else:
+                textos = [linea for linea in sys.stdin.read().splitlines() if linea.strip()]
+            for respuesta in asyncio.run(enviar(textos, args.socket, args.puerto, alfabeto=args.alfabeto)):
+                print(json.dumps(respuesta, ensure_ascii=False))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
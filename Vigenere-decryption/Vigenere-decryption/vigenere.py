@@ -1,53 +1,70 @@
-import re
+import heapq
+import multiprocessing
 import os
-import tkinter as tk
-import unicodedata
+import time
+from array import array
 from collections import defaultdict
-from itertools import chain
-from math import isqrt, log
-from tkinter import messagebox, filedialog
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import isqrt, log, log2
+from operator import eq
+
+import compartidos  # añade la raíz del repositorio (normalizacion) a sys.path
+from instrumentacion import contar, etapa
+from normalizacion import ALFABETO_27, ALFABETO_191, FRECUENCIAS_ESP, Alfabeto, obtener_alfabeto
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
 
 # --------------------------------------------
 # ALFABETOS
 # --------------------------------------------
-alphabet_27 = "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"
-alphabet_191 = ''.join(chr(i) for i in range(32, 223)) # no funciona 
+# Todas las funciones reciben el alfabeto como argumento (un Alfabeto inmutable); por defecto,
+# el de 27 letras. Los nombres en mayúsculas de abajo son solo constantes del alfabeto por defecto.
+alphabet_27 = ALFABETO_27
+alphabet_191 = ALFABETO_191
+
+ALFABETO = obtener_alfabeto(alphabet_27)
 
-ALPHABET = alphabet_27
-N = len(ALPHABET)
+ALPHABET = ALFABETO.letras
+N = ALFABETO.n
 
 def make_maps(alphabet):
     return {ch: i for i, ch in enumerate(alphabet)}, dict(enumerate(alphabet))
 
 CHAR_TO_IDX, IDX_TO_CHAR = make_maps(ALPHABET)
 
-freq_map_esp = {
-    'A': 0.1226, 'B': 0.0149, 'C': 0.0387, 'D': 0.0467, 'E': 0.1408,
-    'F': 0.0069, 'G': 0.0100, 'H': 0.0118, 'I': 0.0598, 'J': 0.0052,
-    'K': 0.0011, 'L': 0.0524, 'M': 0.0308, 'N': 0.0683, 'Ñ': 0.0030,
-    'O': 0.0920, 'P': 0.0289, 'Q': 0.0111, 'R': 0.0641, 'S': 0.0720,
-    'T': 0.0460, 'U': 0.0469, 'V': 0.0105, 'W': 0.0004, 'X': 0.0014,
-    'Y': 0.0109, 'Z': 0.0047
-}
+freq_map_esp = FRECUENCIAS_ESP
 
-f_esp = [freq_map_esp.get(ch, 1.0 / len(ALPHABET)) for ch in ALPHABET]
+f_esp = list(ALFABETO.frecuencias)
 
 N_TRIES = 7
 TEXTO_VISIBLE = 200
+MAX_LONGITUD = 20
+ANCHO_HAZ = 1000
+UMBRAL_SCORE = 0.05
+MUESTRA_PUNTUADOR = 2000
 
 # --------------------------------------------
 # FUNCIONES AUXILIARES
 # --------------------------------------------
-def ord_to_index(ch):
-    return CHAR_TO_IDX[ch]
+def ord_to_index(ch, alfabeto: Alfabeto = ALFABETO):
+    return alfabeto.indice(ch)
+
+def index_to_char(i, alfabeto: Alfabeto = ALFABETO):
+    return alfabeto.letra(i)
+
+def normalizar_texto(texto, alfabeto: Alfabeto = ALFABETO):
+    return alfabeto.normalizar(texto)
 
-def index_to_char(i):
-    return IDX_TO_CHAR[i % N]
+def codificar(texto: str, alfabeto: Alfabeto = ALFABETO) -> bytes:
+    # Texto normalizado -> un byte por carácter con su índice en el alfabeto
+    return alfabeto.codificar(texto)
 
-def normalizar_texto(texto):
-    texto = unicodedata.normalize("NFD", texto)
-    texto = texto.upper()
-    return ''.join(ch for ch in texto if ch in ALPHABET)
+def decodificar(codigos, alfabeto: Alfabeto = ALFABETO) -> str:
+    return alfabeto.decodificar(codigos)
 
 def es_repetida(s: str) -> bool:
     n = len(s)
@@ -87,6 +104,105 @@ def trigramas_fuerza_bruta(texto):
                        key=lambda item: item[1]["freq"],
                        reverse=True))
 
+def distancias_ngramas(texto: str, n: int = 3, alfabeto: Alfabeto = ALFABETO):
+    # Cada n-grama se enrolla en un entero; la distancia es a su aparición anterior
+    codigos = alfabeto.codificar(texto)
+    base = alfabeto.n
+    if len(codigos) < n:
+        return []
+
+    if np is not None and base ** n < 2 ** 62:
+        c = np.frombuffer(codigos, dtype=np.uint8).astype(np.int64)
+        ngramas = np.zeros(len(c) - n + 1, dtype=np.int64)
+        for k in range(n):
+            ngramas = ngramas * base + c[k:len(c) - n + 1 + k]
+        orden = np.argsort(ngramas, kind="stable")
+        iguales = ngramas[orden[1:]] == ngramas[orden[:-1]]
+        return (orden[1:][iguales] - orden[:-1][iguales]).tolist()
+
+    return _distancias_ngramas_flujo(codigos, n, base)
+
+def _distancias_ngramas_flujo(codigos: bytes, n: int, base: int):
+    modulo = base ** n
+    # Para N=27 y n=3 son 19 683 casillas; con n grande se usa un diccionario
+    ultima = array("q", [-1]) * modulo if modulo <= 1 << 24 else defaultdict(lambda: -1)
+    codigo = 0
+    for i, c in enumerate(codigos):
+        codigo = (codigo * base + c) % modulo
+        pos = i - n + 1
+        if pos < 0:
+            continue
+        anterior = ultima[codigo]
+        if anterior >= 0:
+            yield pos - anterior
+        ultima[codigo] = pos
+
+def arreglo_sufijos(codigos: bytes) -> list[int]:
+    # Duplicación de prefijos: tras k rondas los sufijos quedan ordenados por 2^k caracteres
+    n = len(codigos)
+    if n == 0:
+        return []
+
+    if np is not None:
+        rango = np.frombuffer(codigos, dtype=np.uint8).astype(np.int64)
+        k = 1
+        while True:
+            siguiente = np.full(n, -1, dtype=np.int64)
+            siguiente[:n - k] = rango[k:]
+            orden = np.lexsort((siguiente, rango))
+            claves_r, claves_s = rango[orden], siguiente[orden]
+            cambios = np.empty(n, dtype=np.int64)
+            cambios[0] = 0
+            cambios[1:] = (claves_r[1:] != claves_r[:-1]) | (claves_s[1:] != claves_s[:-1])
+            nuevo = np.empty(n, dtype=np.int64)
+            nuevo[orden] = np.cumsum(cambios)
+            rango = nuevo
+            if rango.max() == n - 1 or k >= n:
+                return orden.tolist()
+            k *= 2
+
+    rango = list(codigos)
+    k = 1
+    while True:
+        clave = lambda i: (rango[i], rango[i + k] if i + k < n else -1)
+        orden = sorted(range(n), key=clave)
+        nuevo = [0] * n
+        for a, b in zip(orden, orden[1:]):
+            nuevo[b] = nuevo[a] + (clave(a) != clave(b))
+        rango = nuevo
+        if rango[orden[-1]] == n - 1 or k >= n:
+            return orden
+        k *= 2
+
+def prefijos_comunes(codigos: bytes, sufijos: list[int]) -> list[int]:
+    # Kasai: lcp[i] es el prefijo común entre los sufijos sufijos[i-1] y sufijos[i]
+    n = len(codigos)
+    rango = [0] * n
+    for i, s in enumerate(sufijos):
+        rango[s] = i
+    lcp = [0] * n
+    h = 0
+    for i in range(n):
+        if rango[i] > 0:
+            j = sufijos[rango[i] - 1]
+            while i + h < n and j + h < n and codigos[i + h] == codigos[j + h]:
+                h += 1
+            lcp[rango[i]] = h
+            if h > 0:
+                h -= 1
+        else:
+            h = 0
+    return lcp
+
+def repeticiones_sufijos(texto: str, longitud_min: int = 3, alfabeto: Alfabeto = ALFABETO):
+    # Repeticiones de cualquier longitud >= longitud_min como (distancia, longitud)
+    codigos = alfabeto.codificar(texto)
+    sufijos = arreglo_sufijos(codigos)
+    lcp = prefijos_comunes(codigos, sufijos)
+    for i in range(1, len(sufijos)):
+        if lcp[i] >= longitud_min:
+            yield abs(sufijos[i] - sufijos[i - 1]), lcp[i]
+
 def divisores(n: int) -> list[int]:
     divs = set()
     for i in range(1, isqrt(n) + 1):
@@ -95,15 +211,30 @@ def divisores(n: int) -> list[int]:
             divs.add(n // i)
     return list(divs)
 
-def mcd_max_subconjunto(dists: list[int], max_len: int = 20) -> list[tuple[int, float]]:
-    contador = defaultdict(int)
+def histograma_distancias(dists) -> list[int]:
+    if np is not None:
+        dists = np.asarray(dists, dtype=np.int64)
+        return np.bincount(dists).tolist() if dists.size else []
+    hist = []
     for num in dists:
-        for d in divisores(num):
-            if 2 <= d <= max_len:
-                contador[d] += 1
+        if num >= len(hist):
+            hist.extend([0] * (num + 1 - len(hist)))
+        hist[num] += 1
+    return hist
+
+def mcd_max_subconjunto(dists: list[int], max_len: int | None = None) -> list[tuple[int, float]]:
+    # Sin factorizar cada distancia: el soporte de d es la suma del histograma en sus múltiplos
+    if max_len is None:
+        max_len = MAX_LONGITUD
+    hist = histograma_distancias(dists)
+    total = sum(hist)
+    contador = {}
+    for d in range(2, min(max_len, len(hist) - 1) + 1):
+        cnt = sum(hist[d::d])
+        if cnt:
+            contador[d] = cnt
 
     puntuaciones = []
-    total = len(dists)
     for d, cnt in contador.items():
         score = (cnt / total) * log(d + 1)
         puntuaciones.append((d, score))
@@ -113,115 +244,494 @@ def mcd_max_subconjunto(dists: list[int], max_len: int = 20) -> list[tuple[int,
 # --------------------------------------------
 # FUNCIONES DE ANÁLISIS
 # --------------------------------------------
-def analisis_subcriptogramas(subcriptos: list[str], mcd: int) -> list[dict[int, list[tuple[int, float]]]]:
-    posible_clave = []
-    for i in range(mcd):
-        col = subcriptos[i]
-        n = len(col)
-        counts = [0] * N
-        for ch in col:
-            counts[ord_to_index(ch)] += 1
-        f_obs = [counts[j]/n for j in range(N)] if n > 0 else [0]*N
+@lru_cache(maxsize=None)
+def matriz_circulante(f_ref: tuple[float, ...]):
+    # C[k][s] = f_ref[(k - s) % n]: la puntuación de la columna para el desplazamiento s es (f_obs @ C)[s]
+    n = len(f_ref)
+    filas = [[f_ref[(k - s) % n] for s in range(n)] for k in range(n)]
+    return np.array(filas) if np is not None else filas
+
+def histogramas_columnas(texto: str, mcd: int, alfabeto: Alfabeto = ALFABETO):
+    # Fila i: conteo de cada letra en las posiciones i, i + mcd, i + 2*mcd...
+    codigos = alfabeto.codificar(texto)
+    n = alfabeto.n
+    if np is not None:
+        a = np.frombuffer(codigos, dtype=np.uint8).astype(np.int64)
+        columnas = np.arange(len(a)) % mcd
+        return np.bincount(columnas * n + a, minlength=mcd * n).reshape(mcd, n)
+    return [[col.count(j) for j in range(n)] for col in (codigos[i::mcd] for i in range(mcd))]
+
+def mejores_desplazamientos(hist, k: int | None = None, alfabeto: Alfabeto = ALFABETO) -> list[list[tuple[int, float]]]:
+    # Puntuación de todos los desplazamientos de todas las columnas con un solo producto matricial
+    circulante = matriz_circulante(alfabeto.frecuencias)
+    N = alfabeto.n
+    if np is not None:
+        hist = np.asarray(hist, dtype=np.float64)
+        f_obs = hist / np.maximum(hist.sum(axis=1, keepdims=True), 1)
+        return mejores_por_fila(f_obs @ circulante, k)
 
+    puntuaciones = []
+    for counts in hist:
+        n = sum(counts)
+        f_obs = [c / n for c in counts] if n > 0 else [0] * N
+        fila = [sum(f * c for f, c in zip(f_obs, (circulante[j][s] for j in range(N)))) for s in range(N)]
+        puntuaciones.append(fila)
+    return mejores_por_fila(puntuaciones, k)
+
+def mejores_por_fila(puntuaciones, k: int | None = None) -> list[list[tuple[int, float]]]:
+    # Una fila por columna y una puntuación por desplazamiento; k=None usa el N_TRIES actual
+    if k is None:
+        k = N_TRIES
+    if np is not None:
+        puntuaciones = np.asarray(puntuaciones)
+        N = puntuaciones.shape[1] if puntuaciones.ndim == 2 else 0
+        k = min(k, N)
+        if k < N:
+            candidatos = np.argpartition(-puntuaciones, k - 1, axis=1)[:, :k]
+        else:
+            candidatos = np.broadcast_to(np.arange(N), puntuaciones.shape)
         mejores = []
-        for s in range(N):
-            score = sum(f_obs[(j + s) % N] * f_esp[j % N] for j in range(N))
-            mejores.append((s, score))
-        mejores.sort(key=lambda x: x[1], reverse=True)
-
-        posible_clave.append({
-            "columna": i,
-            "mejores_desplazamientos": mejores[:N_TRIES]
-        })
+        for fila, cand in zip(puntuaciones, candidatos):
+            orden = cand[np.lexsort((cand, -fila[cand]))]
+            mejores.append(list(zip(orden.tolist(), fila[orden].tolist())))
+        return mejores
+    return [sorted(enumerate(fila), key=lambda x: x[1], reverse=True)[:k] for fila in puntuaciones]
+
+def analisis_columnas(hist, alfabeto: Alfabeto = ALFABETO) -> list[dict[int, list[tuple[int, float]]]]:
+    return [{"columna": i, "mejores_desplazamientos": mejores, "conteo": [int(c) for c in fila]}
+            for i, (fila, mejores) in enumerate(zip(hist, mejores_desplazamientos(hist, alfabeto=alfabeto)))]
+
+def analisis_subcriptogramas(subcriptos: list[str], mcd: int,
+                             alfabeto: Alfabeto = ALFABETO) -> list[dict[int, list[tuple[int, float]]]]:
+    hist = [[0] * alfabeto.n for _ in range(mcd)]
+    for i in range(mcd):
+        for ch in subcriptos[i]:
+            hist[i][alfabeto.indice(ch)] += 1
+    return analisis_columnas(hist, alfabeto)
 
-    return posible_clave
+# --------------------------------------------
+# AUTOCLAVE
+# --------------------------------------------
+# Con clave de longitud m, p[t] = c[t] - p[t - m]: cada columna t = j, j + m, ... es independiente.
+# Desarrollando la recurrencia en la columna j, con S[i] = c[0] - c[1] + c[2] - ... ± c[i]:
+#     p[i] = (-1)^i * (S[i] - k[j])
+# Las posiciones pares ven S desplazado por -k[j] y las impares reflejado, como en Vigenère.
+def _sumas_alternas(a, m: int, n: int):
+    # Filas de m caracteres; devuelve S módulo n por columna y el signo (-1)^i de cada fila
+    filas = -(-len(a) // m)
+    bloques = np.zeros(filas * m, dtype=np.int64)
+    bloques[:len(a)] = a
+    bloques = bloques.reshape(filas, m)
+    signo = 1 - 2 * (np.arange(filas) % 2)[:, None]
+    return np.cumsum(bloques * signo, axis=0) % n, signo
+
+def histogramas_autoclave(texto: str, m: int, alfabeto: Alfabeto = ALFABETO):
+    # Conteo de S por columna, separado en filas pares e impares
+    codigos = alfabeto.codificar(texto)
+    N = alfabeto.n
+    if np is not None:
+        a = np.frombuffer(codigos, dtype=np.uint8)
+        sumas, _ = _sumas_alternas(a, m, N)
+        posiciones = np.arange(len(a))
+        casillas = (posiciones % m) * 2 * N + (posiciones // m) % 2 * N + sumas.reshape(-1)[:len(a)]
+        hist = np.bincount(casillas, minlength=2 * m * N).reshape(m, 2, N)
+        return hist[:, 0], hist[:, 1]
+
+    pares, impares = [[0] * N for _ in range(m)], [[0] * N for _ in range(m)]
+    for j in range(m):
+        suma = 0
+        for i, c in enumerate(codigos[j::m]):
+            if i % 2:
+                suma = (suma - c) % N
+                impares[j][suma] += 1
+            else:
+                suma = (suma + c) % N
+                pares[j][suma] += 1
+    return pares, impares
+
+def analisis_autoclave(texto: str, m: int, alfabeto: Alfabeto = ALFABETO) -> list[dict[int, list[tuple[int, float]]]]:
+    # Puntuación de cada letra inicial de la clave por columna, sin descifrar
+    pares, impares = histogramas_autoclave(texto, m, alfabeto)
+    circulante = matriz_circulante(alfabeto.frecuencias)
+    N = alfabeto.n
+    if np is not None:
+        tam = np.maximum(pares.sum(axis=1) + impares.sum(axis=1), 1)[:, None]
+        puntuaciones = (pares @ circulante + impares @ circulante.T) / tam
+    else:
+        puntuaciones = []
+        for par, impar in zip(pares, impares):
+            tam = max(sum(par) + sum(impar), 1)
+            puntuaciones.append([sum(par[x] * circulante[x][k] + impar[x] * circulante[k][x] for x in range(N)) / tam
+                                 for k in range(N)])
+    return [{"columna": j, "mejores_desplazamientos": mejores,
+             "pares": [int(c) for c in par], "impares": [int(c) for c in impar]}
+            for j, (par, impar, mejores) in enumerate(zip(pares, impares, mejores_por_fila(puntuaciones)))]
+
+def score_autoclave(posible_clave, clave: str, alfabeto: Alfabeto = ALFABETO) -> float:
+    # Igual que score_texto(autoclave_decrypt(...)) a partir de los histogramas de S
+    f_esp, N = alfabeto.frecuencias, alfabeto.n
+    suma, total = 0.0, 0
+    for col, ch in zip(posible_clave, clave):
+        k = alfabeto.indice(ch)
+        suma += sum(c * f_esp[(x - k) % N] for x, c in enumerate(col["pares"]))
+        suma += sum(c * f_esp[(k - x) % N] for x, c in enumerate(col["impares"]))
+        total += sum(col["pares"]) + sum(col["impares"])
+    return suma / total if total else 0
+
+def longitudes_autoclave(texto: str, max_len: int | None = None, alfabeto: Alfabeto = ALFABETO) -> list[int]:
+    # El autoclave no deja periodos en el cifrado: se prueba cada longitud con la mejor clave posible
+    if max_len is None:
+        max_len = MAX_LONGITUD
+    puntuaciones = []
+    for m in range(1, min(max_len, len(texto) // 2) + 1):
+        posible_clave = analisis_autoclave(texto, m, alfabeto)
+        mejor = "".join(alfabeto.letra(col["mejores_desplazamientos"][0][0]) for col in posible_clave)
+        puntuaciones.append((m, score_autoclave(posible_clave, mejor, alfabeto)))
+    return [m for m, _ in sorted(puntuaciones, key=lambda x: x[1], reverse=True)[:N_TRIES]]
 
-def kasinski(texto_cifrado: str):
-    trigramas = trigramas_fuerza_bruta(texto_cifrado)
-    distancias = list(chain.from_iterable([info["dist"] for info in trigramas.values()]))
-    candidatos_mcd = mcd_max_subconjunto(distancias)
-    mcd_vals, _ = zip(*candidatos_mcd) if candidatos_mcd else ([], [])
+# --------------------------------------------
+# ESTIMACIÓN DE LONGITUD
+# --------------------------------------------
+def coincidencias(texto: str, max_desp: int, usar_fft: bool | None = None, alfabeto: Alfabeto = ALFABETO) -> list[float]:
+    # tasa[s] = fracción de posiciones i con texto[i] == texto[i + s]
+    n = len(texto)
+    max_desp = min(max_desp, n - 1)
+    if max_desp < 1:
+        return [1.0]
+
+    if np is None:
+        return [1.0] + [sum(map(eq, texto, texto[s:])) / (n - s) for s in range(1, max_desp + 1)]
+
+    a = np.frombuffer(alfabeto.codificar(texto), dtype=np.uint8)
+    if usar_fft is None:
+        # Cada desplazamiento directo es una pasada; la FFT solo compensa con miles de desplazamientos
+        usar_fft = max_desp > 500 * log2(n + 1)
+
+    if not usar_fft:
+        iguales = [int(np.count_nonzero(a[:-s] == a[s:])) for s in range(1, max_desp + 1)]
+    else:
+        # Autocorrelación de la indicadora de cada letra, sumada en el dominio de frecuencia
+        m = 1 << (2 * n - 1).bit_length()
+        potencia = np.zeros(m // 2 + 1)
+        for letra in np.unique(a):
+            espectro = np.fft.rfft((a == letra).astype(np.float64), m)
+            potencia += espectro.real ** 2 + espectro.imag ** 2
+        iguales = np.rint(np.fft.irfft(potencia, m)[1:max_desp + 1]).tolist()
+
+    return [1.0] + [iguales[s - 1] / (n - s) for s in range(1, max_desp + 1)]
+
+def indice_coincidencia(texto: str, d: int, alfabeto: Alfabeto = ALFABETO) -> float:
+    # Índice de coincidencia de Friedman promediado sobre las d columnas
+    if np is not None:
+        hist = histogramas_columnas(texto, d, alfabeto)
+        tam = hist.sum(axis=1)
+        validas = tam > 1
+        ic = (hist * (hist - 1)).sum(axis=1)[validas] / (tam[validas] * (tam[validas] - 1))
+        return float(ic.mean()) if ic.size else 0.0
+
+    total, columnas = 0.0, 0
+    for k in range(d):
+        col = texto[k::d]
+        m = len(col)
+        if m > 1:
+            total += sum(c * (c - 1) for c in frecuencia(col).values()) / (m * (m - 1))
+            columnas += 1
+    return total / columnas if columnas else 0.0
+
+def ordenar_longitudes(puntuaciones: list[tuple[int, float]], tolerancia: float = 0.9) -> list[tuple[int, float]]:
+    # Los múltiplos de la longitud real puntúan casi igual: entre los cercanos al máximo va primero el menor
+    if not puntuaciones:
+        return []
+    maximo = max(score for _, score in puntuaciones)
+    cercanos = sorted(p for p in puntuaciones if p[1] >= tolerancia * maximo)
+    resto = sorted((p for p in puntuaciones if p[1] < tolerancia * maximo), key=lambda x: x[1], reverse=True)
+    return (cercanos + resto)[:N_TRIES]
+
+def longitudes_autocorrelacion(texto: str, max_len: int | None = None,
+                               alfabeto: Alfabeto = ALFABETO) -> list[tuple[int, float]]:
+    if max_len is None:
+        max_len = MAX_LONGITUD
+    tasas = coincidencias(texto, 3 * max_len, alfabeto=alfabeto)
+    puntuaciones = []
+    for d in range(2, min(max_len, len(tasas) - 1) + 1):
+        multiplos = tasas[d::d][:3]
+        puntuaciones.append((d, sum(multiplos) / len(multiplos)))
+    return ordenar_longitudes(puntuaciones)
+
+def longitudes_indice_coincidencia(texto: str, max_len: int | None = None,
+                                   alfabeto: Alfabeto = ALFABETO) -> list[tuple[int, float]]:
+    if max_len is None:
+        max_len = MAX_LONGITUD
+    limite = min(max_len, len(texto) // 2)
+    return ordenar_longitudes([(d, indice_coincidencia(texto, d, alfabeto)) for d in range(2, limite + 1)])
+
+def longitudes_candidatas(texto_cifrado: str, longitud_min: int = 3, sufijos: bool = False,
+                          estimador: str = "trigramas", alfabeto: Alfabeto = ALFABETO, medidor=None) -> list[int]:
+    if estimador == "autocorrelacion":
+        with etapa(medidor, "autocorrelacion", len(texto_cifrado)):
+            candidatos_mcd = longitudes_autocorrelacion(texto_cifrado, alfabeto=alfabeto)
+    elif estimador == "coincidencia":
+        with etapa(medidor, "coincidencia", len(texto_cifrado)):
+            candidatos_mcd = longitudes_indice_coincidencia(texto_cifrado, alfabeto=alfabeto)
+    else:
+        with etapa(medidor, "distancias", len(texto_cifrado)):
+            if sufijos:
+                distancias = [d for d, _ in repeticiones_sufijos(texto_cifrado, longitud_min, alfabeto)]
+            else:
+                distancias = list(distancias_ngramas(texto_cifrado, longitud_min, alfabeto))
+        contar(medidor, "distancias", len(distancias))
+        with etapa(medidor, "mcd", len(distancias)):
+            candidatos_mcd = mcd_max_subconjunto(distancias)
+    contar(medidor, "longitudes_candidatas", len(candidatos_mcd))
+    return [mcd for mcd, _ in candidatos_mcd]
+
+def _memo(cache, huella, etapa: tuple, calcular):
+    # cache: objeto con obtener(huella, etapa, calcular), por ejemplo cache_analisis.CacheAnalisis
+    return calcular() if cache is None else cache.obtener(huella, etapa, calcular)
+
+# Claves de caché de las longitudes: llevan todo lo que cambia la lista guardada, también
+# MAX_LONGITUD (longitudes probadas) y N_TRIES (el recorte), que se leen en cada llamada
+def _etapa_longitudes(longitud_min: int, sufijos: bool, estimador: str) -> tuple:
+    return ("longitudes", longitud_min, sufijos, estimador, MAX_LONGITUD, N_TRIES)
+
+def _etapa_longitudes_autoclave() -> tuple:
+    return ("longitudes_autoclave", MAX_LONGITUD, N_TRIES)
+
+def kasinski(texto_cifrado: str, longitud_min: int = 3, sufijos: bool = False, estimador: str = "trigramas",
+             cache=None, alfabeto: Alfabeto = ALFABETO, medidor=None):
+    huella = cache.huella(texto_cifrado, repr(alfabeto)) if cache is not None else None
+    with etapa(medidor, "longitudes", len(texto_cifrado)):
+        longitudes = _memo(cache, huella, _etapa_longitudes(longitud_min, sufijos, estimador),
+                           lambda: longitudes_candidatas(texto_cifrado, longitud_min, sufijos, estimador,
+                                                         alfabeto, medidor))
 
     posibles_claves = []
-    for mcd in mcd_vals:
-        subcriptos = [""] * mcd
-        for i in range(len(texto_cifrado)):
-            subcriptos[i % mcd] += texto_cifrado[i]
-
-        posible_clave = analisis_subcriptogramas(subcriptos, mcd)
+    for mcd in longitudes:
+        with etapa(medidor, "analisis", len(texto_cifrado)):
+            posible_clave = _memo(cache, huella, ("analisis", "Vigenere", mcd, N_TRIES),
+                                  lambda: analisis_longitud(texto_cifrado, "Vigenere", mcd, alfabeto))
         posibles_claves.append(posible_clave)
 
     return posibles_claves
 
-def score_texto(texto: str) -> float:
+def enumerar_claves(posible_clave, max_claves: int | None = None, ancho_haz: int = ANCHO_HAZ,
+                    presupuesto: float | None = None, alfabeto: Alfabeto = ALFABETO):
+    # Mejor primero sobre el producto de los top-k de cada columna: la frontera es un heap
+    # ordenado por la puntuación acumulada y se recorta a ancho_haz estados.
+    # max_claves=None usa el N_TRIES actual, leído en cada llamada.
+    if max_claves is None:
+        max_claves = N_TRIES
+    listas = [col["mejores_desplazamientos"] for col in posible_clave]
+    if not listas or not all(listas):
+        return
+    m = len(listas)
+    limite = time.perf_counter() + presupuesto if presupuesto is not None else None
+
+    estado = (0,) * m
+    frontera = [(-sum(lista[0][1] for lista in listas), estado)]
+    vistos = {estado}
+    emitidas = 0
+    while frontera and emitidas < max_claves:
+        if limite is not None and time.perf_counter() > limite:
+            return
+        negativo, estado = heapq.heappop(frontera)
+        yield "".join(alfabeto.letra(listas[c][r][0]) for c, r in enumerate(estado)), -negativo / m
+        emitidas += 1
+
+        for c in range(m):
+            r = estado[c] + 1
+            if r < len(listas[c]):
+                siguiente = estado[:c] + (r,) + estado[c + 1:]
+                if siguiente not in vistos:
+                    vistos.add(siguiente)
+                    perdida = listas[c][r - 1][1] - listas[c][r][1]
+                    heapq.heappush(frontera, (negativo + perdida, siguiente))
+
+        # Recorte amortizado: solo cuando la frontera duplica el ancho del haz
+        if len(frontera) > 2 * ancho_haz:
+            frontera = heapq.nsmallest(ancho_haz, frontera)
+
+def score_texto(texto: str, alfabeto: Alfabeto = ALFABETO) -> float:
+    f_esp, N = alfabeto.frecuencias, alfabeto.n
     counts = [0] * N
     for ch in texto:
-        if ch in CHAR_TO_IDX:
-            counts[ord_to_index(ch)] += 1
+        if ch in alfabeto.indices:
+            counts[alfabeto.indice(ch)] += 1
     n = len(texto)
     if n == 0:
         return 0
     f_obs = [c/n for c in counts]
     return sum(f_obs[i] * f_esp[i % len(f_esp)] for i in range(N))
 
+def score_vigenere(posible_clave, clave: str, alfabeto: Alfabeto = ALFABETO) -> float:
+    # Igual que score_texto(vigenere_decrypt(...)) sin descifrar: el histograma de cada
+    # columna rotado por su desplazamiento es el de su texto en claro
+    f_esp, N = alfabeto.frecuencias, alfabeto.n
+    suma, total = 0.0, 0
+    for col, ch in zip(posible_clave, clave):
+        k = alfabeto.indice(ch)
+        conteo = col["conteo"]
+        suma += sum(c * f_esp[(j - k) % N] for j, c in enumerate(conteo))
+        total += sum(conteo)
+    return suma / total if total else 0
+
 # --------------------------------------------
 # FUNCIONES DE DECODIFICACIÓN
 # --------------------------------------------
-def vigenere_decrypt(texto_cifrado: str, clave: str) -> str:
-    if not clave:
-        raise ValueError("Clave vacía")
-    plaintext_chars = []
-    ki = 0
-    for ch in texto_cifrado:
-        c_idx = ord_to_index(ch)
-        k_idx = ord_to_index(clave[ki % len(clave)])
-        p_idx = (c_idx - k_idx) % N
-        plaintext_chars.append(index_to_char(p_idx))
-        ki += 1
-    return ''.join(plaintext_chars)
-
-def autoclave_decrypt(texto_cifrado: str, clave: str) -> str:
+def codificar_clave(clave: str, alfabeto: Alfabeto = ALFABETO) -> bytes:
+    # codificar() lleva a 0 lo que no está en el alfabeto: la clave se valida antes
     if not clave:
         raise ValueError("Clave vacía")
-    plaintext_chars = []
-    for ci, ch in enumerate(texto_cifrado):
-        c_idx = ord_to_index(ch)
-        if ci < len(clave):
-            k_idx = ord_to_index(clave[ci])
-        else:
-            k_idx = ord_to_index(plaintext_chars[ci - len(clave)])
-        p_idx = (c_idx - k_idx) % N
-        plaintext_chars.append(index_to_char(p_idx))
-    return ''.join(plaintext_chars)
-
-def descifrar(texto_cifrado: str) -> str:
-    texto_cifrado = normalizar_texto(texto_cifrado)
-    des = kasinski(texto_cifrado)
-    resultados = []
-
-    for d_ in des:
-        for i in range(N_TRIES):
-            clave = ""
-            chi_sqr = 0
-            for d in d_:
-                clave += index_to_char(d["mejores_desplazamientos"][i][0])
-                chi_sqr = d["mejores_desplazamientos"][i][1]
-
-            if chi_sqr > 0.05:
-                texto_vig = vigenere_decrypt(texto_cifrado, clave)
-                score_vig = score_texto(texto_vig)
-
-                texto_auto = autoclave_decrypt(texto_cifrado, clave)
-                score_auto = score_texto(texto_auto)
-
-                if not es_repetida(clave):
-                    resultados.append((clave, "Vigenere", score_vig, texto_vig[:TEXTO_VISIBLE]))
-                    resultados.append((clave, "Autoclave", score_auto, texto_auto[:TEXTO_VISIBLE]))
-
-    resultados.sort(key=lambda x: x[2], reverse=True)
+    for ch in clave:
+        if ch not in alfabeto.indices:
+            raise ValueError(f"La clave contiene un carácter fuera del alfabeto: {ch!r}")
+    return alfabeto.codificar(clave)
+
+def vigenere_decrypt(texto_cifrado: str, clave: str, alfabeto: Alfabeto = ALFABETO) -> str:
+    c, k, N = alfabeto.codificar(texto_cifrado), codificar_clave(clave, alfabeto), alfabeto.n
+    if np is not None:
+        a = np.frombuffer(c, dtype=np.uint8).astype(np.int64)
+        p = (a - np.resize(np.frombuffer(k, dtype=np.uint8), len(a))) % N
+        return alfabeto.decodificar(p.astype(np.uint8))
+    return alfabeto.decodificar(bytes((a - b) % N for a, b in zip(c, k * (len(c) // len(k) + 1))))
+
+def autoclave_decrypt(texto_cifrado: str, clave: str, alfabeto: Alfabeto = ALFABETO) -> str:
+    c, k, m, N = alfabeto.codificar(texto_cifrado), codificar_clave(clave, alfabeto), len(clave), alfabeto.n
+    if np is not None:
+        # Forma cerrada por columnas (ver AUTOCLAVE): p = (-1)^i * (S - k)
+        sumas, signo = _sumas_alternas(np.frombuffer(c, dtype=np.uint8), m, N)
+        p = (sumas - np.frombuffer(k, dtype=np.uint8)) * signo % N
+        return alfabeto.decodificar(p.reshape(-1)[:len(c)].astype(np.uint8))
+
+    # Cada bloque de m caracteres solo depende del bloque anterior
+    p = bytearray(len(c))
+    previo = k
+    for i in range(0, len(c), m):
+        bloque = bytes((a - b) % N for a, b in zip(c[i:i + m], previo))
+        p[i:i + len(bloque)] = bloque
+        previo = bloque
+    return alfabeto.decodificar(p)
+
+def seleccionar_resultados(resultados: list, cantidad: int | None = None) -> list:
+    # Las variantes de una misma longitud puntúan casi igual: primero el mejor de cada
+    # (longitud, tipo) y después el resto, para que no acaparen todo el listado
+    if cantidad is None:
+        cantidad = N_TRIES
+    resultados = sorted(resultados, key=lambda x: x[2], reverse=True)
+    vistos, primeros, resto = set(), [], []
+    for r in resultados:
+        grupo = (len(r[0]), r[1])
+        (resto if grupo in vistos else primeros).append(r)
+        vistos.add(grupo)
+    return (primeros + resto)[:cantidad]
+
+def analisis_longitud(texto_cifrado: str, tipo: str, mcd: int, alfabeto: Alfabeto = ALFABETO):
+    if tipo == "Autoclave":
+        return analisis_autoclave(texto_cifrado, mcd, alfabeto)
+    return analisis_columnas(histogramas_columnas(texto_cifrado, mcd, alfabeto), alfabeto)
+
+def analizar_longitud(texto_cifrado: str, tipo: str, mcd: int, claves_por_longitud: int | None = None,
+                      ancho_haz: int = ANCHO_HAZ, presupuesto: float | None = None, puntuador=None,
+                      posible_clave=None, alfabeto: Alfabeto = ALFABETO, medidor=None) -> tuple[list, list]:
+    # Devuelve el análisis por columnas (para guardarlo en caché) y los candidatos.
+    # Sin puntuador se usa la puntuación de unigramas, exacta y sin descifrar. Un puntuador
+    # (por ejemplo ngramas.PuntuadorNgramas) recibe el descifrado de un prefijo acotado.
+    if posible_clave is None:
+        with etapa(medidor, "analisis", len(texto_cifrado)):
+            posible_clave = analisis_longitud(texto_cifrado, tipo, mcd, alfabeto)
+    if tipo == "Autoclave":
+        puntuar, descifrar_clave = score_autoclave, autoclave_decrypt
+    else:
+        puntuar, descifrar_clave = score_vigenere, vigenere_decrypt
+    muestra = texto_cifrado[:MUESTRA_PUNTUADOR]
 
+    resultados = []
+    enumeradas = 0
+    with etapa(medidor, "claves"):
+        for clave, score_medio in enumerar_claves(posible_clave, claves_por_longitud, ancho_haz, presupuesto, alfabeto):
+            enumeradas += 1
+            if score_medio > UMBRAL_SCORE and not es_repetida(clave):
+                if puntuador is None:
+                    score = puntuar(posible_clave, clave, alfabeto)
+                else:
+                    score = puntuador(descifrar_clave(muestra, clave, alfabeto))
+                resultados.append((clave, tipo, score))
+    contar(medidor, "claves_enumeradas", enumeradas)
+    contar(medidor, "claves_puntuadas", len(resultados))
+    return posible_clave, resultados
+
+# Texto cifrado de la tarea en curso; solo se asigna en los procesos del pool
+_texto_compartido = ""
+
+def _compartir_texto(texto_cifrado: str):
+    global _texto_compartido
+    _texto_compartido = texto_cifrado
+
+def _analizar_longitud_compartida(argumentos):
+    return analizar_longitud(_texto_compartido, *argumentos)
+
+def analizar_en_paralelo(texto_cifrado: str, tareas: list[tuple], procesos: int | None = None) -> list:
+    # Cada tarea (argumentos de analizar_longitud sin el texto) va a un proceso; el texto no viaja con ella
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+    # El texto llega a cada proceso como argumento del inicializador y no se toca el global
+    # del padre, así que varios hilos pueden romper cifrados distintos a la vez. Con fork los
+    # argumentos se heredan sin copiarlos; sin fork viajan una vez por proceso, no por tarea.
+    contexto = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(procesos, mp_context=contexto, initializer=_compartir_texto,
+                             initargs=(texto_cifrado,)) as pool:
+        return list(pool.map(_analizar_longitud_compartida, tareas))
+
+def descifrar_resultados(texto_cifrado: str, claves_por_longitud: int | None = None, ancho_haz: int = ANCHO_HAZ,
+                         presupuesto: float | None = None, procesos: int | None = 1,
+                         puntuador=None, cache=None, alfabeto: Alfabeto = ALFABETO,
+                         medidor=None) -> list[tuple[str, str, float, str]]:
+    # Lista ordenada de (clave, tipo, score, preview); procesos=None usa todos los núcleos.
+    # Con cache se reutilizan las longitudes candidatas y los análisis por columnas.
+    # Con medidor (instrumentacion.Medidor) se mide cada etapa; sin él no se mide nada.
+    with etapa(medidor, "normalizacion", len(texto_cifrado)):
+        texto_cifrado = alfabeto.normalizar(texto_cifrado)
+    huella = cache.huella(texto_cifrado, repr(alfabeto)) if cache is not None else None
+    with etapa(medidor, "longitudes", len(texto_cifrado)):
+        longitudes = _memo(cache, huella, _etapa_longitudes(3, False, "trigramas"),
+                           lambda: longitudes_candidatas(texto_cifrado, alfabeto=alfabeto, medidor=medidor))
+    with etapa(medidor, "longitudes_autoclave", len(texto_cifrado)):
+        autoclave = _memo(cache, huella, _etapa_longitudes_autoclave(),
+                          lambda: longitudes_autoclave(texto_cifrado, alfabeto=alfabeto))
+    tareas = [("Vigenere", mcd) for mcd in longitudes] + [("Autoclave", m) for m in autoclave]
+
+    etapas = [("analisis", *tarea, N_TRIES) for tarea in tareas]
+    previos = [cache.buscar(huella, e) for e in etapas] if cache is not None else [None] * len(tareas)
+    argumentos = [(*tarea, claves_por_longitud, ancho_haz, presupuesto, puntuador, previo, alfabeto)
+                  for tarea, previo in zip(tareas, previos)]
+
+    with etapa(medidor, "longitudes_probadas", len(tareas)):
+        if procesos == 1 or len(tareas) < 2:
+            partes = [analizar_longitud(texto_cifrado, *args, medidor=medidor) for args in argumentos]
+        else:
+            # Los procesos no informan al medidor: solo se mide el total y se cuentan los resultados
+            partes = analizar_en_paralelo(texto_cifrado, argumentos, procesos)
+            contar(medidor, "claves_puntuadas", sum(len(parte) for _, parte in partes))
+
+    if cache is not None:
+        for e, previo, (posible_clave, _) in zip(etapas, previos, partes):
+            if previo is None:
+                cache.guardar(huella, e, posible_clave)
+    resultados = [r for _, parte in partes for r in parte]
+
+    # Solo se descifran los resultados finales, y solo lo que se muestra
+    visible = texto_cifrado[:TEXTO_VISIBLE]
+    with etapa(medidor, "previews"):
+        return [(clave, tipo, score,
+                 (vigenere_decrypt if tipo == "Vigenere" else autoclave_decrypt)(visible, clave, alfabeto))
+                for clave, tipo, score in seleccionar_resultados(resultados)]
+
+def descifrar(texto_cifrado: str, claves_por_longitud: int | None = None, ancho_haz: int = ANCHO_HAZ,
+              presupuesto: float | None = None, procesos: int | None = 1, puntuador=None, cache=None,
+              alfabeto: Alfabeto = ALFABETO, medidor=None) -> str:
+    resultados = descifrar_resultados(texto_cifrado, claves_por_longitud, ancho_haz, presupuesto, procesos,
+                                      puntuador, cache, alfabeto, medidor)
     lines = []
-    for clave, tipo, score, preview in resultados[:N_TRIES]:
+    for clave, tipo, score, preview in resultados:
         lines.append(f"\tClave: {clave} ({tipo}) → Score={score:.4f}")
         lines.append(f"\tPreview: {preview}")
         lines.append("")
@@ -230,73 +740,81 @@ def descifrar(texto_cifrado: str) -> str:
 # --------------------------------------------
 # TKINTER
 # --------------------------------------------
-def ejecutar_descifrado():
-    global ALPHABET, N, CHAR_TO_IDX, IDX_TO_CHAR, f_esp
+def iniciar_gui():
+    import tkinter as tk
+    from tkinter import messagebox, filedialog
 
-    ALPHABET = alphabet_27
+    texto_descifrado = ""
 
-    CHAR_TO_IDX, IDX_TO_CHAR = make_maps(ALPHABET)
+    def ejecutar_descifrado():
+        nonlocal texto_descifrado
 
-    texto = entrada_texto.get("1.0", tk.END).strip()
-    texto = normalizar_texto(texto)
+        alfabeto = obtener_alfabeto(alphabet_27 if var_alfabeto.get() == 27 else alphabet_191)
 
-    global texto_descifrado
-    texto_descifrado = descifrar(texto)
+        texto = entrada_texto.get("1.0", tk.END).strip()
+        texto = normalizar_texto(texto, alfabeto)
 
-    salida_texto.config(state="normal")
-    salida_texto.delete("1.0", tk.END)
-    salida_texto.insert(tk.END, texto_descifrado)
-    salida_texto.config(state="disabled")
+        texto_descifrado = descifrar(texto, alfabeto=alfabeto)
 
-    messagebox.showinfo("Éxito", "Texto descifrado generado correctamente.")
+        salida_texto.config(state="normal")
+        salida_texto.delete("1.0", tk.END)
+        salida_texto.insert(tk.END, texto_descifrado)
+        salida_texto.config(state="disabled")
 
-def guardar_archivo():
-    if not texto_descifrado:
-        messagebox.showerror("Error", "No hay texto descifrado para guardar.")
-        return
-    try:
-        ruta = os.path.join(os.path.dirname(__file__), "cifrado.txt")
-        with open(ruta, "w", encoding="utf-8") as f:
-            f.write(texto_descifrado)
-        messagebox.showinfo("Éxito", f"Archivo guardado en:\n{ruta}")
-    except Exception as e:
-        messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{e}")
-
-def cargar_archivo():
-    archivo = filedialog.askopenfile(
-        title="Seleccionar archivo",
-        filetypes=[("Archivos de texto", "*.txt")]
-    )
-    if archivo:
+        messagebox.showinfo("Éxito", "Texto descifrado generado correctamente.")
+
+    def guardar_archivo():
+        if not texto_descifrado:
+            messagebox.showerror("Error", "No hay texto descifrado para guardar.")
+            return
         try:
-            with open(archivo.name, 'r', encoding='utf-8') as f:
-                contenido = f.read()
-            entrada_texto.delete("1.0", tk.END)
-            entrada_texto.insert(tk.END, contenido)
+            ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cifrado.txt")
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(texto_descifrado)
+            messagebox.showinfo("Éxito", f"Archivo guardado en:\n{ruta}")
         except Exception as e:
-            messagebox.showerror("Error", f"No se pudo leer el archivo:\n{e}")
+            messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{e}")
+
+    def cargar_archivo():
+        archivo = filedialog.askopenfile(
+            title="Seleccionar archivo",
+            filetypes=[("Archivos de texto", "*.txt")]
+        )
+        if archivo:
+            try:
+                with open(archivo.name, 'r', encoding='utf-8') as f:
+                    contenido = f.read()
+                entrada_texto.delete("1.0", tk.END)
+                entrada_texto.insert(tk.END, contenido)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo leer el archivo:\n{e}")
+
+    ventana = tk.Tk()
+    ventana.title("Descifrado Vigenere / Autoclave")
+    ventana.geometry("600x600")
 
-ventana = tk.Tk() 
-ventana.title("Descifrado Vigenere / Autoclave (no recomendado)")
-ventana.geometry("600x600")
+    tk.Label(ventana, text="Texto cifrado (ingrese manualmente o cargue un archivo):").pack()
+    entrada_texto = tk.Text(ventana, height=6, width=60)
+    entrada_texto.pack()
 
-texto_descifrado = ""
+    tk.Button(ventana, text="Cargar archivo (.txt)", command=cargar_archivo).pack(pady=5)
 
-tk.Label(ventana, text="Texto cifrado (ingrese manualmente o cargue un archivo):").pack()
-entrada_texto = tk.Text(ventana, height=6, width=60)
-entrada_texto.pack()
+    frame_opts = tk.Frame(ventana)
+    frame_opts.pack(pady=5)
 
-tk.Button(ventana, text="Cargar archivo (.txt)", command=cargar_archivo).pack(pady=5)
+    var_alfabeto = tk.IntVar(value=27)
+    tk.Radiobutton(frame_opts, text="Alfabeto 27 (A-Z + Ñ)", variable=var_alfabeto, value=27).pack(side="left")
+    tk.Radiobutton(frame_opts, text="Alfabeto 191 (ASCII extendido)", variable=var_alfabeto, value=191).pack(side="left")
 
-frame_opts = tk.Frame(ventana)
-frame_opts.pack(pady=5)
+    tk.Button(ventana, text="Descifrar", command=ejecutar_descifrado).pack(pady=10)
 
-tk.Button(ventana, text="Descifrar", command=ejecutar_descifrado).pack(pady=10)
+    tk.Label(ventana, text="Texto descifrado:").pack()
+    salida_texto = tk.Text(ventana, height=10, width=70, state="disabled")
+    salida_texto.pack()
 
-tk.Label(ventana, text="Texto descifrado:").pack()
-salida_texto = tk.Text(ventana, height=10, width=70, state="disabled")
-salida_texto.pack()
+    tk.Button(ventana, text="Guardar en archivo .txt", command=guardar_archivo).pack(pady=10)
 
-tk.Button(ventana, text="Guardar en archivo .txt", command=guardar_archivo).pack(pady=10)
+    ventana.mainloop()
 
-ventana.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    iniciar_gui()
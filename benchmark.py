@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# vigenere.py vive en la carpeta del descifrador; se añade al final para que
+# descifrarVigenere sea el de esta carpeta (normalizacion y corpus solo están aquí)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Vigenere-decryption", "Vigenere-decryption"))
+
+import corpus
+import descifrarVigenere
+import permutacion
+import vigenere
+from normalizacion import ALFABETO_27, obtener_alfabeto
+
+TAMANOS = ["1K", "10K", "100K", "1M", "10M", "100M"]
+UNIDADES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+REPETICIONES = 3
+PRUEBAS = 20
+PRESUPUESTO_PRUEBAS = 1 << 20    # caracteres por tamaño para medir el acierto
+MAX_ROTURA = 10 << 20            # las etapas de rotura usan decenas de bytes por carácter
+LONGITUD_CLAVE = (4, 12)
+GRUPO_PERMUTACION = 8
+
+# Una medida es regresión si empeora más que la tolerancia relativa y, además, más que
+# el margen absoluto (los tamaños pequeños tienen ruido de microsegundos y kilobytes)
+TOLERANCIA = 0.25
+MARGEN_SEGUNDOS = 0.002
+MARGEN_MEMORIA = 64 << 10
+TOLERANCIA_ACIERTO = 0.1
+
+def leer_tamano(texto: str) -> int:
+    texto = texto.strip().upper().removesuffix("B")
+    unidad = texto[-1:] if texto[-1:] in UNIDADES else ""
+    try:
+        return int(float(texto[:len(texto) - len(unidad)]) * UNIDADES[unidad])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamaño no válido: {texto!r} (ejemplos: 500, 1K, 10M)")
+
+def nombre_tamano(tamano: int) -> str:
+    for unidad in ("G", "M", "K"):
+        if tamano >= UNIDADES[unidad] and tamano % UNIDADES[unidad] == 0:
+            return f"{tamano // UNIDADES[unidad]}{unidad}"
+    return str(tamano)
+
+# --------------------------------------------
+# ETAPAS
+# --------------------------------------------
+# Cada etapa recibe los datos ya generados de un tamaño y devuelve la función que se mide;
+# la preparación (que puede incluir etapas anteriores) queda fuera de la medida.
+def preparar_datos(tamano: int, semilla: int):
+    rng = random.Random(semilla)
+    alfabeto = obtener_alfabeto(ALFABETO_27)
+    bruto = corpus.generar_texto(tamano, rng)
+    claro = corpus.generar_texto_normalizado(tamano, rng)
+    clave = corpus.generar_clave(rng.randint(*LONGITUD_CLAVE), rng)
+    grupo, perm = permutacion.generar_clave(GRUPO_PERMUTACION, GRUPO_PERMUTACION, rng)
+    return {"bruto": bruto, "clave": clave, "alfabeto": alfabeto, "grupo": grupo, "perm": perm,
+            "cifrado": corpus.cifrar_vigenere(claro, clave)}
+
+def _analisis(d):
+    return vigenere.analisis_longitud(d["cifrado"], "Vigenere", len(d["clave"]), d["alfabeto"])
+
+def _permutacion_cifrar(d):
+    texto = permutacion.normalizar_texto(d["bruto"], d["grupo"])
+    return lambda: permutacion.cifrar(texto, d["grupo"], d["perm"])
+
+def _enumerar_y_puntuar(d):
+    posible_clave = _analisis(d)
+    return lambda: vigenere.analizar_longitud(d["cifrado"], "Vigenere", len(d["clave"]),
+                                              posible_clave=posible_clave, alfabeto=d["alfabeto"])
+
+ETAPAS = {
+    "permutacion.normalizar_texto":
+        lambda d: lambda: permutacion.normalizar_texto(d["bruto"], d["grupo"]),
+    "permutacion.cifrar": _permutacion_cifrar,
+    "descifrarVigenere.vigenere_descifrar":
+        lambda d: lambda: descifrarVigenere.vigenere_descifrar(d["cifrado"], d["clave"], d["alfabeto"]),
+    "vigenere.normalizar_texto":
+        lambda d: lambda: vigenere.normalizar_texto(d["bruto"], d["alfabeto"]),
+    "vigenere.longitudes_candidatas":
+        lambda d: lambda: vigenere.longitudes_candidatas(d["cifrado"], alfabeto=d["alfabeto"]),
+    "vigenere.longitudes_autoclave":
+        lambda d: lambda: vigenere.longitudes_autoclave(d["cifrado"], alfabeto=d["alfabeto"]),
+    "vigenere.analisis_longitud":
+        lambda d: lambda: _analisis(d),
+    "vigenere.analisis_autoclave":
+        lambda d: lambda: vigenere.analisis_autoclave(d["cifrado"], len(d["clave"]), d["alfabeto"]),
+    "vigenere.enumerar_y_puntuar": _enumerar_y_puntuar,
+    "vigenere.vigenere_decrypt":
+        lambda d: lambda: vigenere.vigenere_decrypt(d["cifrado"], d["clave"], d["alfabeto"]),
+    "vigenere.autoclave_decrypt":
+        lambda d: lambda: vigenere.autoclave_decrypt(d["cifrado"], d["clave"], d["alfabeto"]),
+    "vigenere.descifrar":
+        lambda d: lambda: vigenere.descifrar_resultados(d["cifrado"], alfabeto=d["alfabeto"]),
+}
+
+# Etapas de rotura completas: además del tiempo se mide si la mejor clave es la real
+CIFRADOS_ACIERTO = {"vigenere.descifrar": ("Vigenere", corpus.cifrar_vigenere),
+                    "vigenere.descifrar_autoclave": ("Autoclave", corpus.cifrar_autoclave)}
+
+# Etapas que solo se miden hasta max_rotura caracteres
+ROTURA = {"vigenere.longitudes_candidatas", "vigenere.longitudes_autoclave", "vigenere.analisis_longitud",
+          "vigenere.analisis_autoclave", "vigenere.enumerar_y_puntuar", *CIFRADOS_ACIERTO}
+
+def medir_acierto(etapa: str, tamano: int, pruebas: int, semilla: int):
+    tipo, cifrar = CIFRADOS_ACIERTO[etapa]
+    rng = random.Random(f"{semilla}:{etapa}:{tamano}")
+    aciertos = 0
+    for _ in range(pruebas):
+        clave = corpus.generar_clave(rng.randint(*LONGITUD_CLAVE), rng)
+        cifrado = cifrar(corpus.generar_texto_normalizado(tamano, rng), clave)
+        resultados = vigenere.descifrar_resultados(cifrado)
+        aciertos += bool(resultados) and resultados[0][:2] == (clave, tipo)
+    return aciertos / pruebas
+
+# --------------------------------------------
+# MEDIDA
+# --------------------------------------------
+def medir(funcion, repeticiones: int, memoria: bool) -> dict:
+    # Mejor tiempo de varias repeticiones; la memoria se mide aparte porque tracemalloc ralentiza
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"segundos": mejor, "pico_memoria": pico}
+
+def ejecutar(tamanos, etapas, repeticiones=REPETICIONES, pruebas=PRUEBAS, semilla=0, memoria=True,
+             max_rotura=MAX_ROTURA, informar=None) -> list[dict]:
+    resultados = []
+    for tamano in tamanos:
+        datos = preparar_datos(tamano, semilla)
+        for etapa in etapas:
+            if etapa in ROTURA and tamano > max_rotura:
+                continue
+            registro = {"etapa": etapa, "tamano": tamano}
+            if etapa in ETAPAS:
+                registro.update(medir(ETAPAS[etapa](datos), repeticiones, memoria))
+                registro["mb_por_s"] = tamano / (1 << 20) / registro["segundos"] if registro["segundos"] else None
+            if etapa in CIFRADOS_ACIERTO:
+                # Con textos grandes se hacen menos pruebas, pero siempre al menos una
+                registro["pruebas"] = max(1, min(pruebas, PRESUPUESTO_PRUEBAS // tamano))
+                registro["acierto"] = medir_acierto(etapa, tamano, registro["pruebas"], semilla)
+            resultados.append(registro)
+            if informar is not None:
+                informar(registro)
+        del datos
+    return resultados
+
+def entorno(semilla: int) -> dict:
+    try:
+        import numpy
+        version_numpy = numpy.__version__
+    except ImportError:
+        version_numpy = None
+    return {"python": platform.python_version(), "numpy": version_numpy, "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(), "nucleos": os.cpu_count(),
+            "semilla": semilla}
+
+# --------------------------------------------
+# LÍNEA BASE
+# --------------------------------------------
+def comparar(resultados: list[dict], base: list[dict], tolerancia: float = TOLERANCIA) -> list[str]:
+    previos = {(r["etapa"], r["tamano"]): r for r in base}
+    regresiones = []
+    for r in resultados:
+        b = previos.get((r["etapa"], r["tamano"]))
+        if b is None:
+            continue
+        donde = f"{r['etapa']} ({nombre_tamano(r['tamano'])})"
+        for campo, margen, unidad in (("segundos", MARGEN_SEGUNDOS, "s"), ("pico_memoria", MARGEN_MEMORIA, " B")):
+            actual, previo = r.get(campo), b.get(campo)
+            if actual is not None and previo is not None and \
+                    actual > previo * (1 + tolerancia) and actual - previo > margen:
+                regresiones.append(f"{donde}: {campo} {previo:.4g}{unidad} -> {actual:.4g}{unidad}")
+        actual, previo = r.get("acierto"), b.get("acierto")
+        if actual is not None and previo is not None and actual < previo - TOLERANCIA_ACIERTO:
+            regresiones.append(f"{donde}: acierto {previo:.0%} -> {actual:.0%}")
+    return regresiones
+
+def imprimir(registro: dict):
+    partes = [f"{registro['etapa']:<38}{nombre_tamano(registro['tamano']):>6}"]
+    if "segundos" in registro:
+        partes.append(f"{registro['segundos'] * 1000:>11.2f} ms")
+        if registro["mb_por_s"] is not None:
+            partes.append(f"{registro['mb_por_s']:>9.1f} MB/s")
+        if registro["pico_memoria"] is not None:
+            partes.append(f"{registro['pico_memoria'] / (1 << 20):>9.2f} MB")
+    if "acierto" in registro:
+        partes.append(f"  acierto {registro['acierto']:.0%} ({registro['pruebas']} pruebas)")
+    print("".join(partes), file=sys.stderr, flush=True)
+
+def main(argv=None):
+    todas = list(ETAPAS) + [e for e in CIFRADOS_ACIERTO if e not in ETAPAS]
+    parser = argparse.ArgumentParser(
+        description="Rendimiento (tiempo, memoria pico, acierto) de los cifradores y del descifrador.")
+    parser.add_argument("-t", "--tamanos", type=leer_tamano, nargs="+", default=[leer_tamano(t) for t in TAMANOS],
+                        help="tamaños de entrada, por ejemplo 1K 10M (por defecto, de 1K a 100M)")
+    parser.add_argument("-e", "--etapas", nargs="+", choices=todas, default=todas, metavar="ETAPA",
+                        help=f"etapas a medir: {', '.join(todas)}")
+    parser.add_argument("-r", "--repeticiones", type=int, default=REPETICIONES, help="se guarda el mejor tiempo")
+    parser.add_argument("-n", "--pruebas", type=int, default=PRUEBAS, help="claves por tamaño para medir el acierto")
+    parser.add_argument("-s", "--semilla", type=int, default=0)
+    parser.add_argument("--max-rotura", type=leer_tamano, default=MAX_ROTURA,
+                        help="tamaño máximo para las etapas de rotura (por defecto 10M)")
+    parser.add_argument("--sin-memoria", action="store_true", help="no medir la memoria pico (tracemalloc)")
+    parser.add_argument("-o", "--salida", help="archivo JSON de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--base", help="JSON de una ejecución anterior contra el que buscar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="empeoramiento relativo admitido frente a la base (por defecto %(default)s)")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.tamanos, args.etapas, args.repeticiones, args.pruebas, args.semilla,
+                          not args.sin_memoria, args.max_rotura, imprimir)
+    informe = {"entorno": entorno(args.semilla), "resultados": resultados}
+
+    regresiones = []
+    if args.base:
+        with open(args.base, "r", encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f)["resultados"], args.tolerancia)
+        informe["base"] = args.base
+        informe["regresiones"] = regresiones
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion}", file=sys.stderr)
+
+    texto = json.dumps(informe, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
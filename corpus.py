@@ -0,0 +1,87 @@
+import random
+from bisect import bisect
+from itertools import accumulate
+
+from normalizacion import ALFABETO_27, obtener_alfabeto
+
+# Generador de texto parecido al español: palabras frecuentes elegidas con pesos de Zipf
+# (la palabra de rango r aparece con probabilidad proporcional a 1/r), en minúsculas,
+# con tildes, eñes y signos de puntuación para que la normalización tenga trabajo real.
+PALABRAS = """
+DE LA QUE EL EN Y A LOS SE DEL LAS UN POR CON NO UNA SU PARA ES AL LO COMO MÁS O PERO SUS
+LE HA ME SI SIN SOBRE ESTE YA ENTRE CUANDO TODO ESTA SER SON DOS TAMBIÉN FUE HABÍA ERA MUY
+AÑOS HASTA DESDE ESTÁ MI PORQUE QUÉ SÓLO HAN YO HAY VEZ PUEDE TODOS ASÍ NOS NI PARTE TIENE
+ÉL UNO DONDE BIEN TIEMPO MISMO ESE AHORA CADA E VIDA OTRO DESPUÉS TE OTROS AUNQUE ESA ESO
+HACE OTRA GOBIERNO TAN DURANTE SIEMPRE DÍA TANTO ELLA TRES SÍ DIJO SIDO GRAN PAÍS SEGÚN
+MENOS MUNDO AÑO ANTES ESTADO CONTRA SINO FORMA CASO NADA HACER GENERAL ESTABA POSIBLE TENÍA
+NIÑOS CIUDAD MUJER HOMBRE NOCHE MAÑANA AGUA CASA PUEBLO TIERRA HISTORIA CAMINO TRABAJO
+MANERA PERSONAS FAMILIA NUEVO NUEVA PRIMERO PRIMERA ÚLTIMO GRUPO LUGAR MOMENTO PROBLEMA
+CAMBIO EJEMPLO CENTRO ESPAÑA SEÑOR SEÑORA PEQUEÑO COMPAÑÍA MÚSICA LIBRO PALABRA CORAZÓN
+RAZÓN NACIÓN CIENCIA MERCADO ESCUELA MÉDICO JUGADOR PARTIDO ECONOMÍA POLÍTICA SOCIEDAD
+JUSTICIA GUERRA PAZ AMOR MUERTE CUERPO CABEZA MANO OJOS VOZ LUZ FUEGO CIELO MAR RÍO MONTAÑA
+ÁRBOL CAMPO CALLE PUERTA VENTANA MESA CAMA PAN VINO CAFÉ LECHE CARNE FRUTA DINERO PRECIO
+VERDAD MENTIRA PREGUNTA RESPUESTA IDEA PENSAMIENTO RECUERDO SUEÑO ESPERANZA MIEDO ALEGRÍA
+""".split()
+
+# Separadores entre palabras y su probabilidad
+SEPARADORES = {" ": 0.88, ". ": 0.05, ", ": 0.05, "; ": 0.01, "? ": 0.005, "! ": 0.005}
+# Se sortean pares palabra + separador, ya en minúsculas. La tabla tiene 2^16 casillas
+# repartidas según los pesos: cada ficha sale de dos bytes aleatorios, sin bisecciones.
+FICHAS = [(p + s).lower() for p in PALABRAS for s in SEPARADORES]
+PESOS_FICHAS = list(accumulate(ps / r for r in range(1, len(PALABRAS) + 1) for ps in SEPARADORES.values()))
+TABLA_FICHAS = [FICHAS[bisect(PESOS_FICHAS, (i + 0.5) / (1 << 16) * PESOS_FICHAS[-1])] for i in range(1 << 16)]
+FICHAS_POR_TANDA = 1 << 16
+
+def generar_texto(tamano: int, semilla=0) -> str:
+    # Exactamente tamano caracteres; la misma semilla da siempre el mismo texto
+    rng = semilla if isinstance(semilla, random.Random) else random.Random(semilla)
+    partes, total = [], 0
+    while total < tamano:
+        k = min(FICHAS_POR_TANDA, (tamano - total) // 5 + 1)
+        indices = memoryview(rng.randbytes(2 * k)).cast("H")
+        tanda = "".join([TABLA_FICHAS[i] for i in indices])
+        partes.append(tanda)
+        total += len(tanda)
+    return "".join(partes)[:tamano]
+
+def generar_texto_normalizado(tamano: int, semilla=0, alfabeto=ALFABETO_27) -> str:
+    # Texto en claro listo para cifrar: exactamente tamano letras del alfabeto
+    rng = semilla if isinstance(semilla, random.Random) else random.Random(semilla)
+    alfabeto = obtener_alfabeto(alfabeto)
+    partes, total = [], 0
+    while total < tamano:
+        # Cada trozo normalizado pierde los espacios y signos (alrededor de un 20 %)
+        trozo = alfabeto.normalizar(generar_texto(min(tamano - total, 1 << 20) * 5 // 4 + 16, rng))
+        partes.append(trozo)
+        total += len(trozo)
+    return "".join(partes)[:tamano]
+
+def generar_clave(longitud: int, semilla=0, alfabeto=ALFABETO_27) -> str:
+    rng = semilla if isinstance(semilla, random.Random) else random.Random(semilla)
+    return "".join(rng.choice(alfabeto) for _ in range(longitud))
+
+# --------------------------------------------
+# CIFRADO DE REFERENCIA
+# --------------------------------------------
+def _tablas_desplazamiento(clave, alfabeto):
+    # Para cada letra de la clave, la tabla de bytes.translate que suma su índice módulo n
+    return [bytes((c + alfabeto.indice(k)) % alfabeto.n for c in range(alfabeto.n)) + bytes(256 - alfabeto.n)
+            for k in clave]
+
+def cifrar_vigenere(texto: str, clave: str, alfabeto=ALFABETO_27) -> str:
+    # texto y clave deben estar normalizados; cada columna se desplaza con un solo translate
+    alfabeto = obtener_alfabeto(alfabeto)
+    codigos = alfabeto.codificar(texto)
+    salida = bytearray(len(codigos))
+    m = len(clave)
+    for j, tabla in enumerate(_tablas_desplazamiento(clave, alfabeto)):
+        salida[j::m] = codigos[j::m].translate(tabla)
+    return alfabeto.decodificar(salida)
+
+def cifrar_autoclave(texto: str, clave: str, alfabeto=ALFABETO_27) -> str:
+    # La clave es la clave inicial seguida del propio texto en claro
+    alfabeto = obtener_alfabeto(alfabeto)
+    codigos = alfabeto.codificar(texto)
+    flujo = alfabeto.codificar(clave) + codigos[:len(codigos) - len(clave)]
+    n = alfabeto.n
+    return alfabeto.decodificar(bytes((c + k) % n for c, k in zip(codigos, flujo)))
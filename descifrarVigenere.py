@@ -1,102 +1,210 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import unicodedata
-
-ALFABETO_27 = "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"
-ALFABETO_191 = ''.join(chr(i) for i in range(32, 223))#ascii extendido
-
-def normalizar_clave(texto_clave, alfabeto):
-    texto = texto_clave.upper()
-    texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
-    texto = ''.join(c for c in texto if c in alfabeto)
-    return texto
-
-def vigenere_descifrar(texto_cifrado, clave_norm, alfabeto):
-    n = len(alfabeto)
-    texto_plano = ""
-    if len(clave_norm) == 0:
-        raise ValueError("Clave vacía tras normalizar. No hay caracteres válidos para el alfabeto seleccionado.")
-
-    for i, ch in enumerate(texto_cifrado):
-        if ch in alfabeto:
-            key_char = clave_norm[i % len(clave_norm)]
-            c = alfabeto.index(ch)
-            k = alfabeto.index(key_char)
-            p = (c - k) % n
-            texto_plano += alfabeto[p]
-        else:
-            texto_plano += ch
-
-    return texto_plano
-
-def cargar_archivo():
-    ruta = filedialog.askopenfilename(title="Seleccionar archivo cifrado", filetypes=[("Text files", "*.txt"), ("All files","*.*")])
-    if ruta:
-        with open(ruta, "r", encoding="utf-8") as f:
-            area_entrada.delete("1.0", tk.END)
-            area_entrada.insert(tk.END, f.read())
-
-def descargar_resultado(texto):
-    ruta = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("All files","*.*")], title="Guardar texto descifrado como")
-    if ruta:
-        with open(ruta, "w", encoding="utf-8") as f:
-            f.write(texto)
-        messagebox.showinfo("Guardado", f"Resultado guardado en:\n{ruta}")
-
-def boton_descifrar():
-    texto_cifrado = area_entrada.get("1.0", tk.END).rstrip("\n")
-    clave = entry_clave.get().strip()
-    if not texto_cifrado:
-        messagebox.showwarning("Error", "Ingrese (o cargue) el texto cifrado.")
-        return
-    if not clave:
-        messagebox.showwarning("Error", "Ingrese la clave usada para cifrar.")
-        return
-
-    alfabeto = ALFABETO_27 if var_alfabeto.get() == 27 else ALFABETO_191
-
-    clave_norm = normalizar_clave(clave, alfabeto)
-    if len(clave_norm) == 0:
-        messagebox.showwarning("Error", "La clave no contiene caracteres válidos del alfabeto seleccionado después de normalizar.")
-        return
-
-    try:
-        texto_a_procesar = texto_cifrado #.upper()
-
-
-        resultado = vigenere_descifrar(texto_a_procesar, clave_norm, alfabeto)
-    except Exception as e:
-        messagebox.showerror("Error al descifrar", str(e))
-        return
-
-    area_salida.delete("1.0", tk.END)
-    area_salida.insert(tk.END, resultado)
+import argparse
+import sys
+from functools import lru_cache
 
-    if messagebox.askyesno("Guardar", "¿Deseas guardar el resultado descifrado en un archivo?"):
-        descargar_resultado(resultado)
+from normalizacion import ALFABETO_27, ALFABETO_191, Alfabeto, obtener_alfabeto, plegar_clave
 
-root = tk.Tk()
-root.title("Descifrado Vigenère - Ventana independiente")
+TAM_TROZO = 1 << 20
 
-tk.Label(root, text="PEGA AQUÍ el texto CIFRADO (o carga archivo):").grid(row=0, column=0, columnspan=3, sticky="w", padx=5, pady=(8,0))
-area_entrada = tk.Text(root, height=8, width=70)
-area_entrada.grid(row=1, column=0, columnspan=3, padx=5, pady=5)
+def normalizar_clave(texto_clave, alfabeto: Alfabeto):
+    return plegar_clave(texto_clave, alfabeto.letras)
 
-tk.Button(root, text="Cargar archivo cifrado", command=cargar_archivo).grid(row=2, column=0, sticky="w", padx=5)
-
-tk.Label(root, text="Clave:").grid(row=3, column=0, sticky="w", padx=5)
-entry_clave = tk.Entry(root, width=40)
-entry_clave.grid(row=3, column=1, padx=5, pady=5, sticky="w")
-
-var_alfabeto = tk.IntVar(value=27)
-tk.Radiobutton(root, text="Alfabeto 27 (A-Z + Ñ)", variable=var_alfabeto, value=27).grid(row=4, column=0, sticky="w", padx=5)
-tk.Radiobutton(root, text="Alfabeto 191 (ASCII extendido)", variable=var_alfabeto, value=191).grid(row=4, column=1, sticky="w")
-
-tk.Button(root, text="Descifrar", command=boton_descifrar, bg="#88c", width=12).grid(row=5, column=0, pady=10, padx=5)
-tk.Button(root, text="Limpiar", command=lambda: (area_entrada.delete("1.0", tk.END), area_salida.delete("1.0", tk.END), entry_clave.delete(0, tk.END))).grid(row=5, column=1, pady=10)
+@lru_cache(maxsize=64)
+def compilar_clave(clave_norm, alfabeto: Alfabeto):
+    # Una tabla de traducción por fase de la clave; los caracteres ajenos al alfabeto no se tocan
+    if len(clave_norm) == 0:
+        raise ValueError("Clave vacía tras normalizar. No hay caracteres válidos para el alfabeto seleccionado.")
 
-tk.Label(root, text="Texto descifrado:").grid(row=6, column=0, columnspan=3, sticky="w", padx=5)
-area_salida = tk.Text(root, height=8, width=70)
-area_salida.grid(row=7, column=0, columnspan=3, padx=5, pady=5)
+    n, letras, indice = alfabeto.n, alfabeto.letras, alfabeto.indices
+    try:
+        desplazamientos = [indice[k] for k in clave_norm]
+    except KeyError as e:
+        raise ValueError(f"La clave contiene un carácter fuera del alfabeto: {e.args[0]!r}")
+
+    tablas = [{ord(ch): letras[(i - d) % n] for ch, i in indice.items()} for d in desplazamientos]
+
+    # Los dos alfabetos caben en Latin-1: ahí basta con bytes.translate
+    tablas_bytes = None
+    if alfabeto.es_latin1:
+        tablas_bytes = []
+        for d in desplazamientos:
+            tabla = bytearray(range(256))
+            for ch, i in indice.items():
+                tabla[ord(ch)] = ord(letras[(i - d) % n])
+            tablas_bytes.append(bytes(tabla))
+
+    return tablas, tablas_bytes
+
+def vigenere_descifrar(texto_cifrado, clave_norm, alfabeto, fase=0):
+    # El carácter i usa la letra (i + fase) % len(clave) de la clave, sea o no del alfabeto
+    tablas, tablas_bytes = compilar_clave(clave_norm, alfabeto)
+    m = len(tablas)
+
+    if tablas_bytes is not None:
+        try:
+            datos = texto_cifrado.encode("latin-1")
+        except UnicodeEncodeError:
+            datos = None
+        if datos is not None:
+            salida = bytearray(len(datos))
+            for k, tabla in enumerate(tablas_bytes):
+                inicio = (k - fase) % m
+                salida[inicio::m] = datos[inicio::m].translate(tabla)
+            return salida.decode("latin-1")
+
+    caracteres = list(texto_cifrado)
+    for k, tabla in enumerate(tablas):
+        inicio = (k - fase) % m
+        caracteres[inicio::m] = texto_cifrado[inicio::m].translate(tabla)
+    return "".join(caracteres)
+
+def descifrar_flujo(trozos, clave_norm, alfabeto, fase=0):
+    # La fase de la clave avanza con cada carácter y se conserva entre trozos
+    m = len(clave_norm)
+    for trozo in trozos:
+        yield vigenere_descifrar(trozo, clave_norm, alfabeto, fase)
+        fase = (fase + len(trozo)) % m
+
+def leer_trozos(archivo, tam_trozo=TAM_TROZO):
+    while True:
+        trozo = archivo.read(tam_trozo)
+        if not trozo:
+            return
+        yield trozo
+
+def descifrar_archivo(ruta_entrada, ruta_salida, clave_norm, alfabeto, tam_trozo=TAM_TROZO):
+    with open(ruta_entrada, "r", encoding="utf-8") as entrada, \
+            open(ruta_salida, "w", encoding="utf-8") as salida:
+        for trozo in descifrar_flujo(leer_trozos(entrada, tam_trozo), clave_norm, alfabeto):
+            salida.write(trozo)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Descifrado Vigenère con clave conocida. Sin argumentos abre la interfaz gráfica."
+    )
+    parser.add_argument("entrada", nargs="?", help="archivo cifrado")
+    parser.add_argument("salida", nargs="?", help="archivo donde escribir el texto descifrado")
+    parser.add_argument("-c", "--clave", help="clave usada para cifrar")
+    parser.add_argument("-a", "--alfabeto", type=int, choices=(27, 191), default=27, help="alfabeto (27 o 191)")
+    args = parser.parse_args(argv)
+
+    if args.entrada is None:
+        iniciar_gui()
+        return 0
+
+    if args.salida is None or not args.clave:
+        parser.error("se requieren el archivo de salida y --clave")
+
+    alfabeto = obtener_alfabeto(ALFABETO_27 if args.alfabeto == 27 else ALFABETO_191)
+    clave_norm = normalizar_clave(args.clave, alfabeto)
+    if len(clave_norm) == 0:
+        parser.error("la clave no contiene caracteres válidos del alfabeto seleccionado después de normalizar")
 
-root.mainloop()
+    try:
+        descifrar_archivo(args.entrada, args.salida, clave_norm, alfabeto)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def iniciar_gui():
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
+    def cargar_archivo():
+        ruta = filedialog.askopenfilename(title="Seleccionar archivo cifrado", filetypes=[("Text files", "*.txt"), ("All files","*.*")])
+        if ruta:
+            with open(ruta, "r", encoding="utf-8") as f:
+                area_entrada.delete("1.0", tk.END)
+                area_entrada.insert(tk.END, f.read())
+
+    def descargar_resultado(texto):
+        ruta = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("All files","*.*")], title="Guardar texto descifrado como")
+        if ruta:
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(texto)
+            messagebox.showinfo("Guardado", f"Resultado guardado en:\n{ruta}")
+
+    def leer_clave():
+        clave = entry_clave.get().strip()
+        if not clave:
+            messagebox.showwarning("Error", "Ingrese la clave usada para cifrar.")
+            return None
+
+        alfabeto = obtener_alfabeto(ALFABETO_27 if var_alfabeto.get() == 27 else ALFABETO_191)
+
+        clave_norm = normalizar_clave(clave, alfabeto)
+        if len(clave_norm) == 0:
+            messagebox.showwarning("Error", "La clave no contiene caracteres válidos del alfabeto seleccionado después de normalizar.")
+            return None
+        return clave_norm, alfabeto
+
+    def boton_descifrar():
+        texto_cifrado = area_entrada.get("1.0", tk.END).rstrip("\n")
+        if not texto_cifrado:
+            messagebox.showwarning("Error", "Ingrese (o cargue) el texto cifrado.")
+            return
+        clave = leer_clave()
+        if clave is None:
+            return
+        clave_norm, alfabeto = clave
+
+        try:
+            resultado = vigenere_descifrar(texto_cifrado, clave_norm, alfabeto)
+        except Exception as e:
+            messagebox.showerror("Error al descifrar", str(e))
+            return
+
+        area_salida.delete("1.0", tk.END)
+        area_salida.insert(tk.END, resultado)
+
+        if messagebox.askyesno("Guardar", "¿Deseas guardar el resultado descifrado en un archivo?"):
+            descargar_resultado(resultado)
+
+    def descifrar_archivo_grande():
+        # De archivo a archivo por trozos, sin pasar el texto por los cuadros de texto
+        clave = leer_clave()
+        if clave is None:
+            return
+        ruta_entrada = filedialog.askopenfilename(title="Seleccionar archivo cifrado", filetypes=[("Text files", "*.txt"), ("All files","*.*")])
+        if not ruta_entrada:
+            return
+        ruta_salida = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("All files","*.*")], title="Guardar texto descifrado como")
+        if not ruta_salida:
+            return
+        try:
+            descifrar_archivo(ruta_entrada, ruta_salida, *clave)
+        except Exception as e:
+            messagebox.showerror("Error al descifrar", str(e))
+            return
+        messagebox.showinfo("Guardado", f"Resultado guardado en:\n{ruta_salida}")
+
+    root = tk.Tk()
+    root.title("Descifrado Vigenère - Ventana independiente")
+
+    tk.Label(root, text="PEGA AQUÍ el texto CIFRADO (o carga archivo):").grid(row=0, column=0, columnspan=3, sticky="w", padx=5, pady=(8,0))
+    area_entrada = tk.Text(root, height=8, width=70)
+    area_entrada.grid(row=1, column=0, columnspan=3, padx=5, pady=5)
+
+    tk.Button(root, text="Cargar archivo cifrado", command=cargar_archivo).grid(row=2, column=0, sticky="w", padx=5)
+    tk.Button(root, text="Descifrar archivo grande", command=descifrar_archivo_grande).grid(row=2, column=1, sticky="w")
+
+    tk.Label(root, text="Clave:").grid(row=3, column=0, sticky="w", padx=5)
+    entry_clave = tk.Entry(root, width=40)
+    entry_clave.grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
+    var_alfabeto = tk.IntVar(value=27)
+    tk.Radiobutton(root, text="Alfabeto 27 (A-Z + Ñ)", variable=var_alfabeto, value=27).grid(row=4, column=0, sticky="w", padx=5)
+    tk.Radiobutton(root, text="Alfabeto 191 (ASCII extendido)", variable=var_alfabeto, value=191).grid(row=4, column=1, sticky="w")
+
+    tk.Button(root, text="Descifrar", command=boton_descifrar, bg="#88c", width=12).grid(row=5, column=0, pady=10, padx=5)
+    tk.Button(root, text="Limpiar", command=lambda: (area_entrada.delete("1.0", tk.END), area_salida.delete("1.0", tk.END), entry_clave.delete(0, tk.END))).grid(row=5, column=1, pady=10)
+
+    tk.Label(root, text="Texto descifrado:").grid(row=6, column=0, columnspan=3, sticky="w", padx=5)
+    area_salida = tk.Text(root, height=8, width=70)
+    area_salida.grid(row=7, column=0, columnspan=3, padx=5, pady=5)
+
+    root.mainloop()
+
+if __name__ == "__main__":
+    sys.exit(main())
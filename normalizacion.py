@@ -0,0 +1,181 @@
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+
+ALFABETO_26 = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+ALFABETO_27 = "ABCDEFGHIJKLMNÑOPQRSTUVWXYZ"
+ALFABETO_191 = ''.join(chr(i) for i in range(32, 223))  # ascii extendido
+
+FRECUENCIAS_ESP = {
+    'A': 0.1226, 'B': 0.0149, 'C': 0.0387, 'D': 0.0467, 'E': 0.1408,
+    'F': 0.0069, 'G': 0.0100, 'H': 0.0118, 'I': 0.0598, 'J': 0.0052,
+    'K': 0.0011, 'L': 0.0524, 'M': 0.0308, 'N': 0.0683, 'Ñ': 0.0030,
+    'O': 0.0920, 'P': 0.0289, 'Q': 0.0111, 'R': 0.0641, 'S': 0.0720,
+    'T': 0.0460, 'U': 0.0469, 'V': 0.0105, 'W': 0.0004, 'X': 0.0014,
+    'Y': 0.0109, 'Z': 0.0047
+}
+
+# Con el alfabeto de 191 el texto conserva minúsculas, espacios y signos; las vocales con
+# tilde y la ñ (fuera del rango) pasan a mayúsculas con tilde y Ñ. Las letras reparten
+# FRECUENCIAS_ESP entre minúsculas y mayúsculas, las vocales con tilde salen de la
+# frecuencia de su vocal y lo demás (dígitos, símbolos) apenas aparece.
+TILDES_ESP = {'Á': 0.0050, 'É': 0.0043, 'Í': 0.0073, 'Ó': 0.0083, 'Ú': 0.0017, 'Ü': 0.0001}
+SIGNOS_ESP = {
+    ' ': 0.1650, ',': 0.0100, '.': 0.0080, ';': 0.0004, ':': 0.0003, '"': 0.0004,
+    '¿': 0.0003, '?': 0.0003, '¡': 0.0002, '!': 0.0002, '(': 0.0002, ')': 0.0002, '-': 0.0005
+}
+PROPORCION_MAYUSCULAS = 0.03
+FRECUENCIA_MINIMA = 0.00001
+
+def _frecuencias_191():
+    letras = dict(FRECUENCIAS_ESP)
+    for ch, f in TILDES_ESP.items():
+        letras[unicodedata.normalize('NFD', ch)[0]] -= f
+    resto = 1 - sum(SIGNOS_ESP.values())
+    frecuencias = {ch: FRECUENCIA_MINIMA for ch in ALFABETO_191}
+    for ch, f in letras.items():
+        if ch == 'Ñ':
+            frecuencias[ch] = f * resto
+        else:
+            frecuencias[ch] = f * resto * PROPORCION_MAYUSCULAS
+            frecuencias[ch.lower()] = f * resto * (1 - PROPORCION_MAYUSCULAS)
+    frecuencias.update({ch: f * resto for ch, f in TILDES_ESP.items()})
+    frecuencias.update(SIGNOS_ESP)
+    total = sum(frecuencias.values())
+    return {ch: f / total for ch, f in frecuencias.items()}
+
+FRECUENCIAS_191 = _frecuencias_191()
+
+def plegar_caracter(ch, alfabeto):
+    # Lo que ya está en el alfabeto no cambia (un cifrado con el de 191 usa minúsculas y
+    # signos). Si no, mayúsculas; las letras del alfabeto (como la Ñ) se conservan, el resto
+    # pierde la tilde
+    if ch in alfabeto:
+        return ch
+    mayus = ch.upper()
+    if all(c in alfabeto for c in mayus):
+        return mayus
+    base = unicodedata.normalize('NFD', mayus)
+    return ''.join(c for c in base if unicodedata.category(c) != 'Mn' and c in alfabeto)
+
+class TablaNormalizacion(dict):
+    # Tabla para str.translate: cada carácter nuevo se resuelve una vez y queda memorizado
+    def __init__(self, alfabeto):
+        super().__init__()
+        self.alfabeto = alfabeto
+
+        # Ruta rápida para texto Latin-1: una sola pasada de bytes.translate. Los caracteres
+        # que se pliegan a varias letras (ß -> SS) no caben en la tabla y la desactivan.
+        tabla = bytearray(range(256))
+        borrar = bytearray()
+        self.multiples = ""
+        for b in range(256):
+            r = plegar_caracter(chr(b), alfabeto)
+            if not r:
+                borrar.append(b)
+            elif len(r) == 1 and ord(r) < 256:
+                tabla[b] = ord(r)
+            else:
+                self.multiples += chr(b)
+        self.tabla_latin1 = bytes(tabla)
+        self.borrar_latin1 = bytes(borrar)
+
+    def __missing__(self, codigo):
+        resultado = plegar_caracter(chr(codigo), self.alfabeto) or None
+        self[codigo] = resultado
+        return resultado
+
+    def normalizar(self, texto):
+        try:
+            datos = texto.encode('latin-1')
+        except UnicodeEncodeError:
+            return texto.translate(self)
+        if not texto.isascii() and any(ch in texto for ch in self.multiples):
+            return texto.translate(self)
+        return datos.translate(self.tabla_latin1, self.borrar_latin1).decode('latin-1')
+
+@lru_cache(maxsize=None)
+def obtener_tabla(alfabeto):
+    return TablaNormalizacion(alfabeto)
+
+def normalizar(texto, alfabeto=ALFABETO_27):
+    return obtener_tabla(alfabeto).normalizar(texto)
+
+def plegar_clave(texto, alfabeto=ALFABETO_27):
+    # Las letras de una clave se pliegan como en el alfabeto de 27 (mayúsculas sin tilde, con
+    # Ñ) aunque el alfabeto admita minúsculas o tildes: "Clávé" es CLAVE en los dos alfabetos.
+    # Lo que no es letra (espacios, dígitos, signos) se conserva si está en el alfabeto.
+    partes = []
+    for ch in texto:
+        letra = plegar_caracter(ch, ALFABETO_27)
+        partes.append(letra if letra and all(c in alfabeto for c in letra) else plegar_caracter(ch, alfabeto))
+    return ''.join(partes)
+
+def normalizar_flujo(trozos, alfabeto=ALFABETO_27):
+    # Cada carácter se normaliza por separado, así que los trozos pueden cortarse en cualquier punto
+    tabla = obtener_tabla(alfabeto)
+    for trozo in trozos:
+        yield tabla.normalizar(trozo)
+
+# --------------------------------------------
+# ALFABETO
+# --------------------------------------------
+@dataclass(frozen=True)
+class Alfabeto:
+    # Inmutable: todas las tablas se calculan al construirlo y se pueden compartir entre hilos
+    letras: str
+    frecuencias: tuple[float, ...]
+    n: int = field(init=False)
+    indices: MappingProxyType = field(init=False, repr=False, compare=False)
+    es_latin1: bool = field(init=False, repr=False, compare=False)
+    tabla_codigos: bytes | None = field(init=False, repr=False, compare=False)
+    tabla_letras: bytes | None = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not 0 < len(self.letras) <= 256 or len(set(self.letras)) != len(self.letras):
+            raise ValueError("El alfabeto debe tener entre 1 y 256 letras distintas")
+        if len(self.frecuencias) != len(self.letras):
+            raise ValueError("Se necesita una frecuencia por letra")
+        asignar = object.__setattr__
+        asignar(self, "n", len(self.letras))
+        asignar(self, "indices", MappingProxyType({ch: i for i, ch in enumerate(self.letras)}))
+        asignar(self, "es_latin1", all(ord(ch) < 256 for ch in self.letras))
+
+        # Texto <-> un byte por carácter con su índice; con letras fuera de Latin-1 se usa str.translate
+        codigos, letras = bytearray(256), bytearray(256)
+        if self.es_latin1:
+            for i, ch in enumerate(self.letras):
+                codigos[ord(ch)] = i
+                letras[i] = ord(ch)
+        asignar(self, "tabla_codigos", bytes(codigos) if self.es_latin1 else None)
+        asignar(self, "tabla_letras", bytes(letras) if self.es_latin1 else None)
+
+    def __reduce__(self):
+        # Al enviarlo a otro proceso solo viajan las letras y las frecuencias
+        return Alfabeto, (self.letras, self.frecuencias)
+
+    def indice(self, ch: str) -> int:
+        return self.indices[ch]
+
+    def letra(self, i: int) -> str:
+        return self.letras[i % self.n]
+
+    def normalizar(self, texto: str) -> str:
+        return normalizar(texto, self.letras)
+
+    def codificar(self, texto: str) -> bytes:
+        if self.es_latin1:
+            return texto.encode('latin-1').translate(self.tabla_codigos)
+        return bytes(self.indices.get(ch, 0) for ch in texto)
+
+    def decodificar(self, codigos) -> str:
+        if self.es_latin1:
+            return bytes(codigos).translate(self.tabla_letras).decode('latin-1')
+        return ''.join(self.letras[c] for c in bytes(codigos))
+
+@lru_cache(maxsize=None)
+def obtener_alfabeto(letras: str = ALFABETO_27) -> Alfabeto:
+    # Un objeto por alfabeto y proceso; las letras sin frecuencia conocida reciben 1/n
+    frecuencias = FRECUENCIAS_191 if letras == ALFABETO_191 else FRECUENCIAS_ESP
+    return Alfabeto(letras, tuple(frecuencias.get(ch, 1.0 / len(letras)) for ch in letras))
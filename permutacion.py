@@ -1,111 +1,609 @@
-import tkinter as tk
-from tkinter import messagebox, filedialog
-import re
+import argparse
+import json
+import mmap
 import os
+import random
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from math import lcm
+
+from normalizacion import ALFABETO_26, normalizar, normalizar_flujo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan cortes con paso
+    np = None
+
+TAM_TROZO = 1 << 20
+TAM_TROZO_GUI = 1 << 16
+VENTANA = 1 << 24
+
+def completar(texto, grupo):
+    return texto + 'X' * (-len(texto) % grupo)
 
 def normalizar_texto(texto, grupo):
-    texto = texto.upper()
-    texto = re.sub(r'[^A-Z]', '', texto)
+    texto = normalizar(texto, ALFABETO_26)
+    return completar(texto, grupo)
+
+def validar_permutacion(grupo, permutacion):
+    if sorted(permutacion) != list(range(1, grupo+1)):
+        raise ValueError(f"La permutación debe ser una reordenación de 1 a {grupo}.")
+
+def indices_permutacion(permutacion):
+    return [p - 1 for p in permutacion]
+
+def invertir_permutacion(permutacion):
+    inversa = [0] * len(permutacion)
+    for j, p in enumerate(permutacion):
+        inversa[p - 1] = j + 1
+    return inversa
+
+def permutar_buffer(origen, destino, grupo, indices, ventana=VENTANA):
+    # Permuta directamente de un buffer (bytes, memoryview, mmap) a otro ya reservado.
+    # La cola que no completa un bloque se copia sin cambios.
+    total = len(origen)
+    completo = total - total % grupo
+    if np is not None:
+        entrada = np.frombuffer(origen, dtype=np.uint8, count=completo).reshape(-1, grupo)
+        salida = np.frombuffer(destino, dtype=np.uint8, count=completo).reshape(-1, grupo)
+        np.take(entrada, indices, axis=1, out=salida, mode="clip")
+    else:
+        # Por ventanas, para que las copias intermedias de los cortes queden acotadas
+        paso = max(1, ventana // grupo) * grupo
+        for inicio in range(0, completo, paso):
+            fin = min(inicio + paso, completo)
+            for j, i in enumerate(indices):
+                destino[inicio+j:fin:grupo] = origen[inicio+i:fin:grupo]
+    destino[completo:total] = origen[completo:total]
+
+def permutar_bloques(datos, grupo, indices):
+    # nuevo[j] = bloque[indices[j]] para todos los bloques a la vez
+    if len(datos) % grupo != 0:
+        raise ValueError(f"La longitud del texto debe ser múltiplo de {grupo}.")
+
+    salida = bytearray(len(datos))
+    permutar_buffer(datos, salida, grupo, indices)
+    return bytes(salida)
+
+def permutar_caracteres(texto, grupo, indices):
+    # Para texto que no cabe en un byte por carácter: cortes de paso grupo sobre el str
+    if len(texto) % grupo != 0:
+        raise ValueError(f"La longitud del texto debe ser múltiplo de {grupo}.")
+
+    salida = [""] * len(texto)
+    for j, i in enumerate(indices):
+        salida[j::grupo] = texto[i::grupo]
+    return "".join(salida)
+
+# --------------------------------------------
+# CLAVES COMPILADAS
+# --------------------------------------------
+class ClavePermutacion:
+    # Clave ya validada: el carácter j de cada bloque sale de la posición indices[j]
+    __slots__ = ("grupo", "indices")
+
+    def __init__(self, grupo, indices):
+        self.grupo = grupo
+        self.indices = tuple(indices)
+
+    @property
+    def permutacion(self):
+        return [i + 1 for i in self.indices]
+
+    def inversa(self):
+        inversa = [0] * self.grupo
+        for j, i in enumerate(self.indices):
+            inversa[i] = j
+        return ClavePermutacion(self.grupo, inversa)
+
+    def ampliar(self, grupo):
+        # La misma clave expresada sobre bloques de tamaño múltiplo de self.grupo
+        if grupo % self.grupo != 0:
+            raise ValueError(f"{grupo} no es múltiplo de {self.grupo}.")
+        return ClavePermutacion(grupo, [b + i for b in range(0, grupo, self.grupo) for i in self.indices])
+
+    def seguida_de(self, otra):
+        # Aplicar self y luego otra equivale a un único índice sobre el mcm de ambos grupos
+        grupo = lcm(self.grupo, otra.grupo)
+        primera, segunda = self.ampliar(grupo).indices, otra.ampliar(grupo).indices
+        return ClavePermutacion(grupo, [primera[i] for i in segunda])
+
+    def cifrar(self, texto):
+        # Un byte por carácter si el texto cabe en Latin-1 (el normalizado siempre cabe)
+        try:
+            datos = texto.encode("latin-1")
+        except UnicodeEncodeError:
+            return permutar_caracteres(texto, self.grupo, self.indices)
+        return permutar_bloques(datos, self.grupo, self.indices).decode("latin-1")
+
+    def descifrar(self, texto):
+        return self.inversa().cifrar(texto)
 
-    while len(texto) % grupo != 0:
-        texto += 'X'
+    def __eq__(self, otra):
+        return isinstance(otra, ClavePermutacion) and (self.grupo, self.indices) == (otra.grupo, otra.indices)
 
-    return texto
+    def __hash__(self):
+        return hash((self.grupo, self.indices))
+
+    def __repr__(self):
+        return f"ClavePermutacion({self.grupo}, {self.permutacion})"
+
+@lru_cache(maxsize=256)
+def _compilar_clave(grupo, permutacion):
+    validar_permutacion(grupo, permutacion)
+    return ClavePermutacion(grupo, indices_permutacion(permutacion))
+
+def compilar_clave(grupo, permutacion):
+    return _compilar_clave(grupo, tuple(permutacion))
+
+@lru_cache(maxsize=256)
+def _compilar_rondas(rondas):
+    clave = None
+    for grupo, permutacion in rondas:
+        ronda = _compilar_clave(grupo, permutacion)
+        clave = ronda if clave is None else clave.seguida_de(ronda)
+    if clave is None:
+        raise ValueError("Se necesita al menos una ronda.")
+    return clave
+
+def compilar_rondas(rondas):
+    # rondas: [(grupo, permutacion), ...] en el orden en que se aplican
+    return _compilar_rondas(tuple((grupo, tuple(perm)) for grupo, perm in rondas))
 
 def cifrar(texto, grupo, permutacion):
-    bloques = []
-    for i in range(0, len(texto), grupo):
-        bloque = texto[i:i+grupo]
-        nuevo = "".join(bloque[permutacion[j]-1] for j in range(grupo))
-        bloques.append(nuevo)
-    return "".join(bloques)
+    return compilar_clave(grupo, permutacion).cifrar(texto)
+
+def descifrar(texto, grupo, permutacion):
+    return compilar_clave(grupo, permutacion).descifrar(texto)
+
+def cifrar_rondas(texto, rondas):
+    # El texto debe estar normalizado al grupo de la clave compuesta (mcm de las rondas)
+    return compilar_rondas(rondas).cifrar(texto)
+
+def descifrar_rondas(texto, rondas):
+    return compilar_rondas(rondas).descifrar(texto)
+
+def leer_trozos(archivo, tam_trozo=TAM_TROZO):
+    while True:
+        trozo = archivo.read(tam_trozo)
+        if not trozo:
+            return
+        yield trozo
+
+def bloques_normalizados(trozos, grupo):
+    # El bloque incompleto de cada trozo pasa al siguiente; solo se rellena al final
+    resto = ""
+    for trozo in normalizar_flujo(trozos, ALFABETO_26):
+        texto = resto + trozo
+        corte = len(texto) - len(texto) % grupo
+        resto = texto[corte:]
+        if corte:
+            yield texto[:corte]
+    if resto:
+        yield completar(resto, grupo)
+
+def cifrar_archivo(ruta_entrada, ruta_salida, grupo, permutacion, tam_trozo=TAM_TROZO):
+    with open(ruta_entrada, "r", encoding="utf-8") as entrada, \
+            open(ruta_salida, "w", encoding="utf-8") as salida:
+        for bloque in bloques_normalizados(leer_trozos(entrada, tam_trozo), grupo):
+            salida.write(cifrar(bloque, grupo, permutacion))
+
+def cifrar_por_trozos(texto, grupo, permutacion, tam_trozo=TAM_TROZO, cancelado=None):
+    # Genera (trozo cifrado, fracción procesada); se detiene si se activa `cancelado`
+    total = len(texto) or 1
+    leidos = 0
+
+    def trozos():
+        nonlocal leidos
+        for inicio in range(0, len(texto), tam_trozo):
+            if cancelado is not None and cancelado.is_set():
+                return
+            leidos = min(inicio + tam_trozo, len(texto))
+            yield texto[inicio:inicio + tam_trozo]
+
+    for bloque in bloques_normalizados(trozos(), grupo):
+        yield cifrar(bloque, grupo, permutacion), leidos / total
+
+# --------------------------------------------
+# MODO BINARIO
+# --------------------------------------------
+def cifrar_bytes(datos, grupo, permutacion):
+    clave = compilar_clave(grupo, permutacion)
+    salida = bytearray(len(datos))
+    permutar_buffer(datos, salida, grupo, clave.indices)
+    return salida
+
+def descifrar_bytes(datos, grupo, permutacion):
+    # compilar_clave valida la permutación antes de invertirla
+    return cifrar_bytes(datos, grupo, compilar_clave(grupo, permutacion).inversa().permutacion)
+
+def cifrar_binario(ruta_entrada, ruta_salida, grupo, permutacion):
+    # Sin decodificar: la entrada se mapea en memoria y se permuta sobre la salida mapeada
+    indices = compilar_clave(grupo, permutacion).indices
+    with open(ruta_entrada, "rb") as entrada, open(ruta_salida, "wb+") as salida:
+        total = os.fstat(entrada.fileno()).st_size
+        salida.truncate(total)
+        if total == 0:
+            return
+        with mmap.mmap(entrada.fileno(), 0, access=mmap.ACCESS_READ) as origen, \
+                mmap.mmap(salida.fileno(), total) as destino:
+            permutar_buffer(origen, destino, grupo, indices)
+            destino.flush()
+
+def descifrar_binario(ruta_entrada, ruta_salida, grupo, permutacion):
+    cifrar_binario(ruta_entrada, ruta_salida, grupo, compilar_clave(grupo, permutacion).inversa().permutacion)
+
+# --------------------------------------------
+# LÍNEA DE COMANDOS
+# --------------------------------------------
+def ruta_destino(ruta_entrada, carpeta_salida, sufijo):
+    base, ext = os.path.splitext(os.path.basename(ruta_entrada))
+    carpeta = carpeta_salida or os.path.dirname(ruta_entrada)
+    return os.path.join(carpeta, f"{base}.{sufijo}{ext or '.txt'}")
+
+def procesar_archivos(rutas, grupo, permutacion, carpeta_salida=None, descifrado=False, binario=False):
+    compilar_clave(grupo, permutacion)
+    if carpeta_salida:
+        os.makedirs(carpeta_salida, exist_ok=True)
 
-def ejecutar_cifrado():
-    texto = entrada_texto.get("1.0", tk.END).strip()
+    salidas = []
+    for ruta in rutas:
+        if binario:
+            destino = ruta_destino(ruta, carpeta_salida, "descifrado" if descifrado else "cifrado")
+            procesar = descifrar_binario if descifrado else cifrar_binario
+            procesar(ruta, destino, grupo, permutacion)
+        elif descifrado:
+            destino = ruta_destino(ruta, carpeta_salida, "descifrado")
+            with open(ruta, "r", encoding="utf-8") as f:
+                texto = f.read().strip()
+            with open(destino, "w", encoding="utf-8") as f:
+                f.write(descifrar(texto, grupo, permutacion))
+        else:
+            destino = ruta_destino(ruta, carpeta_salida, "cifrado")
+            cifrar_archivo(ruta, destino, grupo, permutacion)
+        salidas.append(destino)
+    return salidas
 
+# --------------------------------------------
+# LOTES (ÁRBOLES DE DIRECTORIOS)
+# --------------------------------------------
+MANIFIESTO = "manifiesto.json"
+
+def generar_clave(grupo_min=4, grupo_max=12, rng=None):
+    rng = rng or random.SystemRandom()
+    grupo = rng.randint(grupo_min, grupo_max)
+    perm = list(range(1, grupo+1))
+    rng.shuffle(perm)
+    return grupo, perm
+
+def listar_arbol(raiz, carpeta_salida=None, omitidos=None):
+    for carpeta, subcarpetas, archivos in os.walk(raiz):
+        subcarpetas.sort()
+        if carpeta_salida and os.path.abspath(carpeta) == os.path.abspath(carpeta_salida):
+            subcarpetas[:] = []
+            continue
+        for nombre in sorted(archivos):
+            relativa = os.path.relpath(os.path.join(carpeta, nombre), raiz)
+            # Sin carpeta espejo el manifiesto y las salidas quedan junto a las entradas: no se
+            # cifran, y el motivo se anota en omitidos (si se pasa un diccionario)
+            motivo = None
+            if not carpeta_salida and relativa == MANIFIESTO:
+                motivo = "manifiesto de claves"
+            elif not carpeta_salida and ".cifrado." in nombre:
+                motivo = "salida de un cifrado anterior"
+            if motivo is None:
+                yield relativa
+            elif omitidos is not None:
+                omitidos[relativa] = motivo
+
+def cifrar_tarea(tarea):
+    ruta_entrada, ruta_salida, grupo, perm = tarea
     try:
-        grupo = int(entrada_grupo.get())
-    except ValueError:
-        messagebox.showerror("Error", "El tamaño de grupo debe ser un número entero.")
-        return
+        os.makedirs(os.path.dirname(ruta_salida) or ".", exist_ok=True)
+        cifrar_archivo(ruta_entrada, ruta_salida, grupo, perm)
+    except (OSError, UnicodeDecodeError) as e:
+        if os.path.exists(ruta_salida):
+            os.remove(ruta_salida)
+        return str(e)
+    return None
+
+def cifrar_arbol(raiz, carpeta_salida=None, grupo_min=4, grupo_max=12, procesos=None, semilla=None):
+    # Cada archivo recibe su propia clave; las claves se guardan en el manifiesto. semilla
+    # puede ser un random.Random para que varios árboles sigan una misma secuencia de claves
+    if isinstance(semilla, random.Random):
+        rng = semilla
+    else:
+        rng = random.Random(semilla) if semilla is not None else random.SystemRandom()
+    destino = carpeta_salida or raiz
+
+    omitidos = {}
+    relativas = []
+    tareas = []
+    manifiesto = {}
+    origen_salida = {}
+    for relativa in listar_arbol(raiz, carpeta_salida, omitidos):
+        salida = ruta_destino(relativa, None, "cifrado")
+        if salida in origen_salida:
+            # "informe" e "informe.txt" darían el mismo archivo cifrado
+            omitidos[relativa] = f"su salida coincide con la de {origen_salida[salida]}"
+            continue
+        origen_salida[salida] = relativa
+        grupo, perm = generar_clave(grupo_min, grupo_max, rng)
+        relativas.append(relativa)
+        tareas.append((os.path.join(raiz, relativa), os.path.join(destino, salida), grupo, perm))
+        manifiesto[relativa] = {"salida": salida, "grupo": grupo, "permutacion": perm}
+
+    # Muchos archivos pequeños: se reparten en paquetes para no pagar IPC por archivo
+    procesos = procesos or os.cpu_count() or 1
+    paquete = max(1, len(tareas) // (procesos * 8))
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        errores = list(pool.map(cifrar_tarea, tareas, chunksize=paquete))
+
+    for relativa, error in zip(relativas, errores):
+        if error is not None:
+            manifiesto[relativa]["error"] = error
+    for relativa, motivo in omitidos.items():
+        manifiesto[relativa] = {"omitido": motivo}
+
+    os.makedirs(destino, exist_ok=True)
+    ruta_manifiesto = os.path.join(destino, MANIFIESTO)
+    with open(ruta_manifiesto, "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    return ruta_manifiesto, manifiesto
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Cifrado por permutación de grupos. Sin archivos abre la interfaz gráfica."
+    )
+    parser.add_argument("archivos", nargs="*", help="archivos de texto a procesar")
+    parser.add_argument("-g", "--grupo", type=int, help="tamaño del grupo")
+    parser.add_argument("-p", "--permutacion", help='permutación entre comillas, ejemplo: "3 1 4 2"')
+    parser.add_argument("-o", "--salida", help="carpeta de salida (por defecto, junto a cada archivo)")
+    parser.add_argument("-d", "--descifrar", action="store_true", help="descifrar en lugar de cifrar")
+    parser.add_argument("-b", "--binario", action="store_true",
+                        help="permutar los bytes tal cual, sin normalizar ni relleno")
+    parser.add_argument("-r", "--arbol", action="store_true",
+                        help="cifrar árboles de directorios con una clave aleatoria por archivo")
+    parser.add_argument("-j", "--procesos", type=int, help="procesos para --arbol (por defecto, todos los núcleos)")
+    parser.add_argument("--grupo-min", type=int, default=4, help="tamaño mínimo de grupo para --arbol")
+    parser.add_argument("--grupo-max", type=int, default=12, help="tamaño máximo de grupo para --arbol")
+    parser.add_argument("--semilla", type=int, help="semilla para generar claves reproducibles con --arbol")
+    args = parser.parse_args(argv)
+
+    if not args.archivos:
+        iniciar_gui()
+        return 0
+
+    if args.arbol:
+        if not 1 <= args.grupo_min <= args.grupo_max:
+            parser.error("se requiere 1 <= --grupo-min <= --grupo-max")
+        # Con -o y varias carpetas cada árbol va a su propia subcarpeta, con su manifiesto
+        nombres = [os.path.basename(os.path.abspath(raiz)) for raiz in args.archivos]
+        varias = args.salida and len(args.archivos) > 1
+        if varias and len(set(nombres)) < len(nombres):
+            parser.error("con -o y varias carpetas, sus nombres deben ser distintos")
+        # Una sola secuencia de claves para todos los árboles: cada uno recibe claves distintas
+        rng = random.Random(args.semilla) if args.semilla is not None else None
+        for raiz, nombre in zip(args.archivos, nombres):
+            salida = os.path.join(args.salida, nombre) if varias else args.salida
+            ruta, manifiesto = cifrar_arbol(raiz, salida, args.grupo_min, args.grupo_max,
+                                            args.procesos, rng)
+            fallidos = sum(1 for info in manifiesto.values() if "error" in info)
+            omitidos = sum(1 for info in manifiesto.values() if "omitido" in info)
+            print(f"{ruta}: {len(manifiesto) - fallidos - omitidos} archivos cifrados, "
+                  f"{fallidos} con error, {omitidos} omitidos")
+        return 0
 
+    if args.grupo is None or args.permutacion is None:
+        parser.error("se requieren --grupo y --permutacion para procesar archivos")
     try:
-        perm = list(map(int, entrada_permutacion.get().split()))
+        perm = list(map(int, args.permutacion.split()))
     except ValueError:
-        messagebox.showerror("Error", "La permutación debe contener solo números separados por espacio.")
-        return
+        parser.error("la permutación debe contener solo números separados por espacio")
+
+    try:
+        salidas = procesar_archivos(args.archivos, args.grupo, perm,
+                                    args.salida, args.descifrar, args.binario)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
 
-    if sorted(perm) != list(range(1, grupo+1)):
-        messagebox.showerror("Error", f"La permutación debe ser una reordenación de 1 a {grupo}.")
-        return
+    for ruta in salidas:
+        print(ruta)
+    return 0
 
-    texto = normalizar_texto(texto, grupo)
+# --------------------------------------------
+# TKINTER
+# --------------------------------------------
+def iniciar_gui():
+    import tkinter as tk
+    from tkinter import messagebox, filedialog, ttk
 
-    global texto_cifrado
-    texto_cifrado = cifrar(texto, grupo, perm)
+    texto_cifrado = ""
+    tarea = None  # (cola, evento de cancelación, trozos recibidos) mientras hay un cifrado en curso
 
-    salida_texto.config(state="normal")
-    salida_texto.delete("1.0", tk.END)
-    salida_texto.insert(tk.END, texto_cifrado)
-    salida_texto.config(state="disabled")
+    def leer_clave():
+        try:
+            grupo = int(entrada_grupo.get())
+        except ValueError:
+            messagebox.showerror("Error", "El tamaño de grupo debe ser un número entero.")
+            return None
 
-    messagebox.showinfo("Éxito", "Texto cifrado generado correctamente. Ahora puedes guardarlo.")
+        try:
+            perm = list(map(int, entrada_permutacion.get().split()))
+        except ValueError:
+            messagebox.showerror("Error", "La permutación debe contener solo números separados por espacio.")
+            return None
 
-def guardar_archivo():
-    if not texto_cifrado:
-        messagebox.showerror("Error", "No hay texto cifrado para guardar. Primero genera el cifrado.")
-        return
+        try:
+            validar_permutacion(grupo, perm)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return None
 
-    try:
-        ruta = os.path.join(os.path.dirname(__file__), "cifrado.txt")
+        return grupo, perm
+
+    def trabajar(texto, grupo, perm, cola, cancelado):
+        # Hilo de fondo: solo se comunica con Tk a través de la cola
+        try:
+            for trozo, progreso in cifrar_por_trozos(texto, grupo, perm, TAM_TROZO_GUI, cancelado):
+                cola.put(("trozo", trozo, progreso))
+            cola.put(("cancelado" if cancelado.is_set() else "fin", None, None))
+        except Exception as e:
+            cola.put(("error", e, None))
 
-        with open(ruta, "w", encoding="utf-8") as f:
-            f.write(texto_cifrado)
+    def revisar_cola():
+        nonlocal texto_cifrado, tarea
+        cola, cancelado, partes = tarea
+        # Pocos mensajes por ciclo para que la ventana siga respondiendo
+        for _ in range(8):
+            try:
+                tipo, valor, progreso = cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "trozo":
+                partes.append(valor)
+                salida_texto.config(state="normal")
+                salida_texto.insert(tk.END, valor)
+                salida_texto.config(state="disabled")
+                barra_progreso["value"] = progreso * 100
+                continue
 
-        messagebox.showinfo("Éxito", f"Archivo guardado en:\n{ruta}")
-    except Exception as e:
-        messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{e}")
+            tarea = None
+            boton_cifrar.config(state="normal")
+            boton_cancelar.config(state="disabled")
+            if tipo == "fin":
+                texto_cifrado = "".join(partes)
+                barra_progreso["value"] = 100
+                messagebox.showinfo("Éxito", "Texto cifrado generado correctamente. Ahora puedes guardarlo.")
+            elif tipo == "cancelado":
+                messagebox.showinfo("Cancelado", "Cifrado cancelado. El resultado parcial no se guardará.")
+            else:
+                messagebox.showerror("Error", f"No se pudo cifrar el texto:\n{valor}")
+            return
+        ventana.after(50, revisar_cola)
+
+    def ejecutar_cifrado():
+        nonlocal texto_cifrado, tarea
+        if tarea is not None:
+            return
+        texto = entrada_texto.get("1.0", tk.END).strip()
+
+        clave = leer_clave()
+        if clave is None:
+            return
+        grupo, perm = clave
+
+        texto_cifrado = ""
+        salida_texto.config(state="normal")
+        salida_texto.delete("1.0", tk.END)
+        salida_texto.config(state="disabled")
+        barra_progreso["value"] = 0
+        boton_cifrar.config(state="disabled")
+        boton_cancelar.config(state="normal")
+
+        cola, cancelado = queue.Queue(), threading.Event()
+        tarea = (cola, cancelado, [])
+        threading.Thread(target=trabajar, args=(texto, grupo, perm, cola, cancelado), daemon=True).start()
+        ventana.after(50, revisar_cola)
+
+    def cancelar_cifrado():
+        if tarea is not None:
+            tarea[1].set()
+
+    def cifrar_archivo_grande():
+        clave = leer_clave()
+        if clave is None:
+            return
+
+        ruta_entrada = filedialog.askopenfilename(
+            title="Seleccionar archivo a cifrar",
+            filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
+        )
+        if not ruta_entrada:
+            return
+        ruta_salida = filedialog.asksaveasfilename(
+            title="Guardar archivo cifrado como",
+            defaultextension=".txt",
+            filetypes=[("Archivos de texto", "*.txt")]
+        )
+        if not ruta_salida:
+            return
 
-def cargar_archivo():
-    archivo = filedialog.askopenfile(
-        title="Seleccionar archivo",
-        filetypes=[("Archivos de texto", "*.txt")]
-    )
-    if archivo:
         try:
-            with open(archivo.name, 'r', encoding='utf-8') as f:
-                contenido = f.read()
-            entrada_texto.delete("1.0", tk.END)
-            entrada_texto.insert(tk.END, contenido)
+            cifrar_archivo(ruta_entrada, ruta_salida, *clave)
+            messagebox.showinfo("Éxito", f"Archivo cifrado guardado en:\n{ruta_salida}")
         except Exception as e:
-            messagebox.showerror("Error", f"No se pudo leer el archivo:\n{e}")
+            messagebox.showerror("Error", f"No se pudo cifrar el archivo:\n{e}")
+
+    def guardar_archivo():
+        if not texto_cifrado:
+            messagebox.showerror("Error", "No hay texto cifrado para guardar. Primero genera el cifrado.")
+            return
+
+        try:
+            ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cifrado.txt")
+
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(texto_cifrado)
+
+            messagebox.showinfo("Éxito", f"Archivo guardado en:\n{ruta}")
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{e}")
+
+    def cargar_archivo():
+        archivo = filedialog.askopenfile(
+            title="Seleccionar archivo",
+            filetypes=[("Archivos de texto", "*.txt")]
+        )
+        if archivo:
+            try:
+                with open(archivo.name, 'r', encoding='utf-8') as f:
+                    contenido = f.read()
+                entrada_texto.delete("1.0", tk.END)
+                entrada_texto.insert(tk.END, contenido)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo leer el archivo:\n{e}")
+
+    ventana = tk.Tk()
+    ventana.title("Cifrado por Permutación de Grupos")
+    ventana.geometry("550x620")
+
+    tk.Label(ventana, text="Texto claro (ingrese manualmente o cargue un archivo):").pack()
+    entrada_texto = tk.Text(ventana, height=6, width=60)
+    entrada_texto.pack()
+
+    tk.Button(ventana, text="Cargar archivo .txt", command=cargar_archivo).pack(pady=5)
 
-ventana = tk.Tk()
-ventana.title("Cifrado por Permutación de Grupos")
-ventana.geometry("550x550")
+    tk.Label(ventana, text="Tamaño del grupo:").pack()
+    entrada_grupo = tk.Entry(ventana)
+    entrada_grupo.pack()
 
-texto_cifrado = ""
+    tk.Label(ventana, text="Permutación (ejemplo: 3 1 4 2):").pack()
+    entrada_permutacion = tk.Entry(ventana)
+    entrada_permutacion.pack()
 
-tk.Label(ventana, text="Texto claro (ingrese manualmente o cargue un archivo):").pack()
-entrada_texto = tk.Text(ventana, height=6, width=60)
-entrada_texto.pack()
+    boton_cifrar = tk.Button(ventana, text="Cifrar", command=ejecutar_cifrado)
+    boton_cifrar.pack(pady=(10, 0))
 
-tk.Button(ventana, text="Cargar archivo .txt", command=cargar_archivo).pack(pady=5)
+    barra_progreso = ttk.Progressbar(ventana, length=300, maximum=100)
+    barra_progreso.pack(pady=5)
 
-tk.Label(ventana, text="Tamaño del grupo:").pack()
-entrada_grupo = tk.Entry(ventana)
-entrada_grupo.pack()
+    boton_cancelar = tk.Button(ventana, text="Cancelar", command=cancelar_cifrado, state="disabled")
+    boton_cancelar.pack(pady=(0, 10))
 
-tk.Label(ventana, text="Permutación (ejemplo: 3 1 4 2):").pack()
-entrada_permutacion = tk.Entry(ventana)
-entrada_permutacion.pack()
+    tk.Label(ventana, text="Texto cifrado:").pack()
+    salida_texto = tk.Text(ventana, height=6, width=60, state="disabled")
+    salida_texto.pack()
 
-tk.Button(ventana, text="Cifrar", command=ejecutar_cifrado).pack(pady=10)
+    tk.Button(ventana, text="Guardar en archivo .txt", command=guardar_archivo).pack(pady=10)
 
-tk.Label(ventana, text="Texto cifrado:").pack()
-salida_texto = tk.Text(ventana, height=6, width=60, state="disabled")
-salida_texto.pack()
+    tk.Button(ventana, text="Cifrar archivo grande (sin cargarlo)", command=cifrar_archivo_grande).pack(pady=5)
 
-tk.Button(ventana, text="Guardar en archivo .txt", command=guardar_archivo).pack(pady=10)
+    ventana.mainloop()
 
-ventana.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+import argparse
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import corpus
+from normalizacion import ALFABETO_26, normalizar
+from permutacion import ClavePermutacion, leer_trozos
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+N = len(ALFABETO_26)
+MAX_GRUPO = 64
+TAM_CORPUS = 1 << 20
+MUESTRA = 1 << 18              # caracteres (bloques completos) que se usan para las estadísticas
+MUESTRA_SIN_NUMPY = 1 << 15
+REINICIOS = 8
+PASOS_POR_COLUMNA = 1000
+FRACCION_MULTIPLO = 0.8
+
+# --------------------------------------------
+# MODELO DE BIGRAMAS
+# --------------------------------------------
+# Información mutua puntual log2(P(ab) / (P(a) P(b))): positiva si b suele seguir a a,
+# cercana a 0 para letras que no tienen relación. Así dos columnas no contiguas puntúan
+# alrededor de 0 aunque tengan letras frecuentes.
+def modelo_bigramas(texto: str) -> list[list[float]]:
+    codigos = normalizar(texto, ALFABETO_26).encode("ascii")
+    pares = [[0.5] * N for _ in range(N)]
+    for a, b in zip(codigos, codigos[1:]):
+        pares[a - 65][b - 65] += 1
+    total = sum(map(sum, pares))
+    filas = [sum(fila) / total for fila in pares]
+    columnas = [sum(pares[a][b] for a in range(N)) / total for b in range(N)]
+    return [[math.log2(pares[a][b] / total / (filas[a] * columnas[b])) for b in range(N)] for a in range(N)]
+
+@lru_cache(maxsize=1)
+def modelo_por_defecto() -> tuple:
+    # Entrenado con el vocabulario de corpus.py, una vez por proceso
+    return tuple(map(tuple, modelo_bigramas(corpus.generar_texto(TAM_CORPUS, 0))))
+
+def modelo_de_archivos(rutas) -> list[list[float]]:
+    partes = []
+    for ruta in rutas:
+        with open(ruta, "r", encoding="utf-8") as f:
+            partes.extend(leer_trozos(f))
+    return modelo_bigramas("".join(partes))
+
+# --------------------------------------------
+# ESTADÍSTICAS POR COLUMNAS
+# --------------------------------------------
+# Con bloques de tamaño grupo, la columna j es la letra j de cada bloque. adyacencia[i][j]
+# es la media del modelo para "columna i seguida de columna j" dentro del mismo bloque;
+# con desfase 1 la columna j se toma del bloque siguiente, con desfase 2 de dos bloques
+# más allá (letras sin relación, sirve de referencia del ruido).
+def codificar(cifrado: str) -> bytes:
+    # Índices 0..25 de las letras del cifrado normalizado
+    return normalizar(cifrado, ALFABETO_26).encode("ascii")
+
+def bloques(codigos: bytes, grupo: int, muestra: int | None = None) -> list[bytes]:
+    if muestra is None:
+        muestra = MUESTRA if np is not None else MUESTRA_SIN_NUMPY
+    cantidad = min(len(codigos) // grupo, max(16, muestra // grupo))
+    tabla = bytes(max(0, c - 65) for c in range(256))
+    return [codigos[b * grupo:(b + 1) * grupo].translate(tabla) for b in range(cantidad)]
+
+def adyacencia(filas: list[bytes], grupo: int, modelo, desfase: int = 0) -> list[list[float]]:
+    origen, destino = filas[:len(filas) - desfase], filas[desfase:]
+    if not origen:
+        return [[0.0] * grupo for _ in range(grupo)]
+
+    if np is not None:
+        # Una columna en one-hot por letra: M = O·modelo da, para cada letra de origen, su fila
+        # del modelo; la suma sobre bloques y letras es un único producto de matrices
+        matriz = np.asarray(modelo, dtype=np.float64)
+        identidad = np.eye(N)
+        a = identidad[np.frombuffer(b"".join(origen), dtype=np.uint8).reshape(-1, grupo)]
+        b = identidad[np.frombuffer(b"".join(destino), dtype=np.uint8).reshape(-1, grupo)]
+        suma = np.tensordot(a @ matriz, b, axes=([0, 2], [0, 2]))
+        return (suma / len(origen)).tolist()
+
+    columnas_a = [bytes(f[i] for f in origen) for i in range(grupo)]
+    columnas_b = columnas_a if desfase == 0 else [bytes(f[i] for f in destino) for i in range(grupo)]
+    return [[sum(modelo[x][y] for x, y in zip(ca, cb)) / len(origen) for cb in columnas_b] for ca in columnas_a]
+
+def _mejor_sucesor(*matrices, excluir_diagonal=True):
+    grupo = len(matrices[0])
+    return sum(max(m[i][j] for k, m in enumerate(matrices) for j in range(grupo)
+                   if not (excluir_diagonal and k == 0 and i == j))
+               for i in range(grupo)) / grupo
+
+def _puntuar_codigos(codigos: bytes, grupo: int, modelo, muestra: int | None = None) -> float:
+    filas = bloques(codigos, grupo, muestra)
+    if len(filas) < 4:
+        return float("-inf")
+    senal = _mejor_sucesor(adyacencia(filas, grupo, modelo), adyacencia(filas, grupo, modelo, 1))
+    ruido = _mejor_sucesor(adyacencia(filas, grupo, modelo, 2), adyacencia(filas, grupo, modelo, 3),
+                           excluir_diagonal=False)
+    return senal - ruido
+
+def puntuar_grupo(cifrado: str, grupo: int, modelo=None, muestra: int | None = None) -> float:
+    # Con el grupo correcto cada columna tiene un sucesor claro: dentro del bloque, o la
+    # primera letra del bloque siguiente si es la última. Se le resta el mismo máximo entre
+    # columnas de bloques no contiguos, que solo mide el ruido de la muestra.
+    return _puntuar_codigos(codificar(cifrado), grupo, modelo or modelo_por_defecto(), muestra)
+
+def detectar_grupo(cifrado: str, max_grupo: int = MAX_GRUPO, modelo=None,
+                   muestra: int | None = None) -> list[tuple[int, float]]:
+    # El cifrado rellena hasta completar el último bloque: solo se prueban divisores de la longitud
+    modelo = modelo or modelo_por_defecto()
+    codigos = codificar(cifrado)
+    puntuaciones = [(g, _puntuar_codigos(codigos, g, modelo, muestra))
+                    for g in range(2, max_grupo + 1) if len(codigos) % g == 0]
+    # Los grupos con menos de cuatro bloques no se pueden puntuar
+    puntuaciones = sorted((p for p in puntuaciones if p[1] > float("-inf")), key=lambda x: x[1], reverse=True)
+    if not puntuaciones:
+        return []
+
+    # Una clave de tamaño g también es clave de 2g, 3g...: se prefiere el divisor más pequeño
+    # del mejor que puntúe casi igual
+    mejor, score = puntuaciones[0]
+    for g, s in sorted(puntuaciones):
+        if mejor % g == 0 and s >= FRACCION_MULTIPLO * score:
+            puntuaciones.remove((g, s))
+            puntuaciones.insert(0, (g, s))
+            break
+    return puntuaciones
+
+# --------------------------------------------
+# BÚSQUEDA DE LA PERMUTACIÓN
+# --------------------------------------------
+# El orden del texto en claro es un camino que pasa una vez por cada columna. Se añade un
+# nodo ficticio (el índice grupo) con peso 0 hacia y desde todas: el camino pasa a ser un
+# ciclo y cada movimiento cambia solo 3 o 4 aristas, así que su efecto se calcula en O(1).
+def puntuar_ciclo(ciclo: list[int], pesos) -> float:
+    return sum(pesos[ciclo[k - 1]][ciclo[k]] for k in range(len(ciclo)))
+
+def dispersion(pesos) -> float:
+    valores = [w for i, fila in enumerate(pesos) for j, w in enumerate(fila) if i != j]
+    media = sum(valores) / len(valores)
+    return math.sqrt(sum((w - media) ** 2 for w in valores) / len(valores))
+
+def ciclo_voraz(pesos, rng, ruido: float = 0.0) -> list[int]:
+    # Se aceptan las aristas de mayor peso que no den a un nodo dos sucesores o dos
+    # predecesores ni cierren un ciclo; los tramos resultantes se encadenan al azar.
+    # Con ruido > 0 los pesos se alteran para que cada reinicio parta de otro sitio.
+    grupo = len(pesos) - 1
+    aristas = sorted(((pesos[i][j] + rng.gauss(0, ruido) if ruido else pesos[i][j], i, j)
+                      for i in range(grupo) for j in range(grupo) if i != j), reverse=True)
+    sucesor, predecesor = {}, {}
+    extremo = list(range(grupo))     # extremo[i]: último nodo del tramo que empieza en i
+    for _, i, j in aristas:
+        if i in sucesor or j in predecesor or extremo[j] == i:
+            continue
+        sucesor[i], predecesor[j] = j, i
+        # El tramo que empieza en el inicio del de i termina ahora donde terminaba el de j
+        inicio = i
+        while inicio in predecesor:
+            inicio = predecesor[inicio]
+        extremo[inicio] = extremo[j]
+        if len(sucesor) == grupo - 1:
+            break
+
+    tramos = []
+    for inicio in range(grupo):
+        if inicio not in predecesor:
+            tramo = [inicio]
+            while tramo[-1] in sucesor:
+                tramo.append(sucesor[tramo[-1]])
+            tramos.append(tramo)
+    rng.shuffle(tramos)
+    return [nodo for tramo in tramos for nodo in tramo] + [grupo]
+
+def recocido(pesos, pasos: int, semilla, ruido: float = 0.0) -> tuple[float, list[int]]:
+    # Recocido simulado con intercambios y traslados de tramos desde un ciclo voraz
+    rng = random.Random(semilla)
+    n = len(pesos)
+    ciclo = ciclo_voraz(pesos, rng, ruido)
+    score = puntuar_ciclo(ciclo, pesos)
+    mejor, mejor_ciclo = score, ciclo[:]
+
+    # Se parte de una temperatura del orden de la dispersión de los pesos: el ciclo voraz
+    # ya es bueno y solo hace falta salir de sus óptimos locales
+    temperatura = inicial = dispersion(pesos) or 1.0
+    final = inicial / 1000
+    enfriamiento = (final / inicial) ** (1 / max(1, pasos))
+
+    for _ in range(pasos):
+        if rng.random() < 0.5:
+            # Intercambio de los nodos de las posiciones i < j
+            i, j = sorted(rng.sample(range(n), 2))
+            a, b = ciclo[i], ciclo[j]
+            pa, sa = ciclo[i - 1], ciclo[(i + 1) % n]
+            pb, sb = ciclo[j - 1], ciclo[(j + 1) % n]
+            if j == i + 1:
+                delta = (pesos[pa][b] + pesos[b][a] + pesos[a][sb]) - (pesos[pa][a] + pesos[a][b] + pesos[b][sb])
+            elif i == 0 and j == n - 1:
+                delta = (pesos[a][b] + pesos[b][sa] + pesos[pb][a]) - (pesos[b][a] + pesos[a][sa] + pesos[pb][b])
+            else:
+                delta = (pesos[pa][b] + pesos[b][sa] + pesos[pb][a] + pesos[a][sb]) - \
+                        (pesos[pa][a] + pesos[a][sa] + pesos[pb][b] + pesos[b][sb])
+            if delta >= 0 or rng.random() < math.exp(delta / temperatura):
+                ciclo[i], ciclo[j] = b, a
+                score += delta
+        else:
+            # Traslado del tramo ciclo[i:i+largo] a continuación de otro nodo
+            largo = rng.randint(1, max(1, min(n - 2, n // 4)))
+            i = rng.randrange(n - largo + 1)
+            tramo = ciclo[i:i + largo]
+            resto = ciclo[:i] + ciclo[i + largo:]
+            k = rng.randrange(len(resto))
+            if k == (i - 1) % len(resto):
+                continue
+            antes, despues = ciclo[i - 1], ciclo[(i + largo) % n]
+            destino, siguiente = resto[k], resto[(k + 1) % len(resto)]
+            delta = (pesos[antes][despues] + pesos[destino][tramo[0]] + pesos[tramo[-1]][siguiente]) - \
+                    (pesos[antes][tramo[0]] + pesos[tramo[-1]][despues] + pesos[destino][siguiente])
+            if delta >= 0 or rng.random() < math.exp(delta / temperatura):
+                ciclo = resto[:k + 1] + tramo + resto[k + 1:]
+                score += delta
+
+        if score > mejor + 1e-12:
+            mejor, mejor_ciclo = score, ciclo[:]
+        temperatura *= enfriamiento
+
+    return puntuar_ciclo(mejor_ciclo, pesos), mejor_ciclo
+
+def _recocido_tarea(tarea):
+    return recocido(*tarea)
+
+def pesos_camino(dentro: list[list[float]]) -> list[list[float]]:
+    # La diagonal no se usa nunca: un nodo no puede seguirse a sí mismo en el ciclo
+    return [fila + [0.0] for fila in dentro] + [[0.0] * (len(dentro) + 1)]
+
+def orden_desde_ciclo(ciclo: list[int], grupo: int) -> list[int]:
+    k = ciclo.index(grupo)
+    return ciclo[k + 1:] + ciclo[:k]
+
+def recuperar_permutacion(cifrado: str, grupo: int, modelo=None, reinicios: int = REINICIOS,
+                          pasos: int | None = None, procesos: int | None = None, semilla=None,
+                          muestra: int | None = None) -> tuple[ClavePermutacion, float]:
+    # Devuelve la clave (cifrar con ella produce el cifrado) y la media del modelo por arista
+    modelo = modelo or modelo_por_defecto()
+    filas = bloques(codificar(cifrado), grupo, muestra)
+    if not filas:
+        raise ValueError(f"El cifrado no tiene ni un bloque completo de {grupo} letras.")
+    pesos = pesos_camino(adyacencia(filas, grupo, modelo))
+    pasos = pasos or PASOS_POR_COLUMNA * grupo
+
+    rng = random.Random(semilla) if semilla is not None else random.SystemRandom()
+    # El primer reinicio parte del ciclo voraz exacto; el resto, de pesos con ruido
+    ruido = dispersion(pesos)
+    tareas = [(pesos, pasos, rng.getrandbits(64), ruido * (r > 0)) for r in range(reinicios)]
+    procesos = min(procesos or os.cpu_count() or 1, reinicios)
+    if procesos == 1:
+        resultados = [_recocido_tarea(t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_recocido_tarea, tareas))
+    score, ciclo = max(resultados, key=lambda r: r[0])
+
+    # orden[k] es la columna cifrada que contiene la letra k del bloque en claro;
+    # la clave hace lo contrario: la letra j del cifrado sale de la posición indices[j]
+    orden = orden_desde_ciclo(ciclo, grupo)
+    indices = [0] * grupo
+    for k, columna in enumerate(orden):
+        indices[columna] = k
+    return ClavePermutacion(grupo, indices), score / max(1, grupo - 1)
+
+def romper(cifrado: str, max_grupo: int = MAX_GRUPO, modelo=None, candidatos: int = 1, **opciones):
+    # Lista de (clave, score del grupo, score de la permutación) para los mejores grupos
+    modelo = modelo or modelo_por_defecto()
+    resultados = []
+    for grupo, score_grupo in detectar_grupo(cifrado, max_grupo, modelo)[:candidatos]:
+        clave, score = recuperar_permutacion(cifrado, grupo, modelo, **opciones)
+        resultados.append((clave, score_grupo, score))
+    return resultados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ataque solo con texto cifrado al cifrado por permutación de grupos: "
+                    "detecta el tamaño de grupo y recupera la permutación.")
+    parser.add_argument("cifrado", help="archivo con el texto cifrado")
+    parser.add_argument("-g", "--grupo", type=int, help="tamaño de grupo conocido (si no, se detecta)")
+    parser.add_argument("--max-grupo", type=int, default=MAX_GRUPO, help="mayor grupo que se prueba")
+    parser.add_argument("-c", "--candidatos", type=int, default=1, help="grupos candidatos a romper")
+    parser.add_argument("-r", "--reinicios", type=int, default=REINICIOS, help="reinicios del recocido")
+    parser.add_argument("--pasos", type=int, help=f"pasos por reinicio (por defecto {PASOS_POR_COLUMNA} por columna)")
+    parser.add_argument("-j", "--procesos", type=int, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("-s", "--semilla", type=int)
+    parser.add_argument("--corpus", nargs="+", help="textos para entrenar los bigramas (por defecto, corpus.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.cifrado, "r", encoding="utf-8") as f:
+            cifrado = f.read()
+        modelo = modelo_de_archivos(args.corpus) if args.corpus else modelo_por_defecto()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.grupo:
+        grupos = [(args.grupo, puntuar_grupo(cifrado, args.grupo, modelo))]
+    else:
+        grupos = detectar_grupo(cifrado, args.max_grupo, modelo)
+        if not grupos:
+            print("Error: ningún grupo hasta --max-grupo divide la longitud del cifrado", file=sys.stderr)
+            return 1
+        print("Grupos: " + ", ".join(f"{g} ({s:.3f})" for g, s in grupos[:5]))
+
+    normalizado = normalizar(cifrado, ALFABETO_26)
+    for grupo, score_grupo in grupos[:args.candidatos]:
+        try:
+            clave, score = recuperar_permutacion(cifrado, grupo, modelo, args.reinicios, args.pasos,
+                                                 args.procesos, args.semilla)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        # Solo bloques completos: con -g el grupo puede no dividir la longitud del cifrado
+        texto = clave.descifrar(normalizado[:grupo * min(200 // grupo + 1, len(normalizado) // grupo)])
+        print(f"\nGrupo {grupo} (score {score_grupo:.3f}), permutación: {' '.join(map(str, clave.permutacion))}")
+        print(f"Score por arista: {score:.3f}")
+        print(f"Preview: {texto}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())